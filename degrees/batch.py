@@ -0,0 +1,86 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import sys
+
+import degrees
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer many degrees-of-separation queries at once."
+    )
+    parser.add_argument("directory", help="directory with people.csv, movies.csv and stars.csv")
+    parser.add_argument("pairs", nargs="?", help="CSV file of source,target rows (default: stdin)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: one per core)")
+    parser.add_argument("--chunksize", type=int, default=64,
+                        help="number of pairs handed to a worker at a time")
+    args = parser.parse_args()
+
+    # Load once up front so the snapshot exists before the workers map it
+    degrees.load_data(args.directory, "csr")
+
+    f = open(args.pairs, encoding="utf-8") if args.pairs else sys.stdin
+    with f, multiprocessing.Pool(
+        args.workers, initializer=degrees.load_data, initargs=(args.directory, "csr")
+    ) as pool:
+        for line in pool.imap(answer, read_pairs(f), args.chunksize):
+            print(line, flush=True)
+
+
+def read_pairs(f):
+    """
+    Yields (source, target) pairs from the non-empty rows of a CSV file.
+    """
+    for row in csv.reader(f):
+        if not row or not "".join(row).strip():
+            continue
+        if len(row) != 2:
+            yield (",".join(row), None)
+        else:
+            yield (row[0].strip(), row[1].strip())
+
+
+def answer(pair):
+    """
+    Returns the result of a single query as a line of JSON.
+    """
+    source, target = pair
+    result = {"source": source, "target": target}
+    if target is None:
+        result["error"] = "Expected a source and a target."
+        return json.dumps(result)
+
+    try:
+        source_id = resolve(source)
+        target_id = resolve(target)
+    except LookupError as e:
+        result["error"] = str(e)
+        return json.dumps(result)
+
+    path = degrees.shortest_path(source_id, target_id)
+    result["degrees"] = None if path is None else len(path)
+    result["path"] = path
+    return json.dumps(result)
+
+
+def resolve(person):
+    """
+    Returns the IMDB id for a person given either their id or their name.
+
+    Raises LookupError if no one, or more than one person, matches.
+    """
+    if degrees.graph.person_index(person) is not None:
+        return person
+    matches = degrees.graph.people_named(person)
+    if len(matches) == 0:
+        raise LookupError(f"Person not found: {person}")
+    if len(matches) > 1:
+        raise LookupError(f"Ambiguous name: {person}")
+    return degrees.graph.person_ids[matches[0]]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import argparse
+import json
+import random
+import resource
+import statistics
+import sys
+import time
+
+import degrees
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure how degrees.py loads data and answers queries."
+    )
+    parser.add_argument("directory", help="directory with people.csv, movies.csv and stars.csv")
+    parser.add_argument("--backend", choices=["dict", "csr"], default="csr", help="graph backend")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="load the csr graph from (and save it to) a snapshot")
+    parser.add_argument("--landmarks", type=int, default=0,
+                        help="number of landmarks to prune searches with")
+    parser.add_argument("--queries", type=int, default=1000, help="number of random queries")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for picking queries")
+    parser.add_argument("--output", help="file to write the JSON report to (default: stdout)")
+    args = parser.parse_args()
+
+    report = benchmark(
+        args.directory, args.backend, args.snapshot, args.landmarks, args.queries, args.seed
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+def benchmark(directory, backend="csr", snapshot=False, landmarks=0, queries=1000, seed=0):
+    """
+    Loads the data in `directory` and times `queries` shortest path
+    searches between random pairs of people, returning a report.
+    """
+    report = {
+        "directory": directory,
+        "backend": backend,
+        "snapshot": snapshot,
+        "landmarks": landmarks,
+        "queries": queries
+    }
+
+    start = time.perf_counter()
+    degrees.load_data(directory, backend, snapshot)
+    report["load_seconds"] = time.perf_counter() - start
+
+    if landmarks:
+        start = time.perf_counter()
+        degrees.load_landmarks(directory, landmarks)
+        report["landmarks_seconds"] = time.perf_counter() - start
+
+    if degrees.graph is None:
+        person_ids = sorted(degrees.people)
+    else:
+        person_ids = degrees.graph.person_ids
+    report["people"] = len(person_ids)
+
+    # Count every person expanded by wrapping the search's neighbor function
+    expanded = 0
+
+    def counted(neighbors):
+        def wrapper(*args):
+            nonlocal expanded
+            expanded += 1
+            return neighbors(*args)
+        return wrapper
+
+    if degrees.graph is None:
+        degrees.neighbors_for_person = counted(degrees.neighbors_for_person)
+    else:
+        degrees.graph.neighbors = counted(degrees.graph.neighbors)
+
+    rng = random.Random(seed)
+    latencies = []
+    expansions = []
+    degree_counts = {}
+    for i in range(queries):
+        source = person_ids[rng.randrange(len(person_ids))]
+        target = person_ids[rng.randrange(len(person_ids))]
+        expanded = 0
+        start = time.perf_counter()
+        path = degrees.shortest_path(source, target)
+        latencies.append(time.perf_counter() - start)
+        expansions.append(expanded)
+        key = "none" if path is None else str(len(path))
+        degree_counts[key] = degree_counts.get(key, 0) + 1
+
+    report["latency_seconds"] = summarize(latencies)
+    report["nodes_expanded"] = summarize(expansions)
+    report["degrees"] = degree_counts
+
+    # ru_maxrss is in kilobytes on Linux
+    report["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return report
+
+
+def summarize(values):
+    """
+    Returns the mean, median, 99th percentile and maximum of `values`.
+    """
+    if not values:
+        return {}
+    if len(values) == 1:
+        percentiles = values * 99
+    else:
+        percentiles = statistics.quantiles(values, n=100, method="inclusive")
+    return {
+        "mean": statistics.fmean(values),
+        "p50": percentiles[49],
+        "p99": percentiles[98],
+        "max": max(values)
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import json
+from collections import OrderedDict
+
+from storage import atomic_write
+
+
+class PathCache():
+    """
+    Least-recently-used cache of shortest paths between pairs of people.
+
+    Since starring together is symmetric, a cached path from one person to
+    another also answers the reverse query. Every cache belongs to a
+    `fingerprint` of the data it was filled from, and is kept on disk at
+    `path`, if given, only for as long as that data does not change.
+    """
+
+    def __init__(self, maxsize=10000, fingerprint=None, path=None):
+        self.maxsize = maxsize
+        self.fingerprint = fingerprint
+        self.path = path
+        self.paths = OrderedDict()
+        self.hits = 0
+        self.reverse_hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.paths)
+
+    def get(self, source, target):
+        """
+        Returns (True, path) if the path from `source` to `target` is
+        cached, where path may be None if they are not connected, and
+        (False, None) otherwise.
+        """
+        key = (source, target)
+        if key in self.paths:
+            self.paths.move_to_end(key)
+            self.hits += 1
+            return True, copy_path(self.paths[key])
+
+        key = (target, source)
+        if key in self.paths:
+            self.paths.move_to_end(key)
+            self.reverse_hits += 1
+            return True, reverse_path(self.paths[key], target)
+
+        self.misses += 1
+        return False, None
+
+    def put(self, source, target, path):
+        """
+        Caches the path from `source` to `target`, evicting the least
+        recently used path if the cache is full.
+        """
+        key = (source, target)
+        self.paths[key] = copy_path(path)
+        self.paths.move_to_end(key)
+        while len(self.paths) > self.maxsize:
+            self.paths.popitem(last=False)
+
+    def discard(self, predicate):
+        """
+        Removes every cached path for which `predicate(source, target, path)`
+        is True, and returns how many were removed.
+        """
+        stale = [key for key, path in self.paths.items() if predicate(key[0], key[1], path)]
+        for key in stale:
+            del self.paths[key]
+        return len(stale)
+
+    def clear(self):
+        self.paths.clear()
+
+    def stats(self):
+        """
+        Returns counts of hits, reverse hits and misses, and the hit rate.
+        """
+        lookups = self.hits + self.reverse_hits + self.misses
+        return {
+            "size": len(self.paths),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "reverse_hits": self.reverse_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.reverse_hits) / lookups if lookups else 0.0
+        }
+
+    def save(self):
+        """
+        Writes the cached paths and their fingerprint to `path` as JSON.
+        """
+        if self.path is None:
+            return
+        data = {
+            "fingerprint": self.fingerprint,
+            "paths": [[source, target, cached] for (source, target), cached in self.paths.items()]
+        }
+        with atomic_write(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def load(self):
+        """
+        Fills the cache from `path`, unless it is missing or was saved
+        with a different fingerprint.
+        """
+        if self.path is None:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("fingerprint") != self.fingerprint:
+            return
+        for source, target, cached in data["paths"]:
+            self.put(source, target, cached)
+
+
+def copy_path(path):
+    """
+    Returns a copy of a path as a list of (movie_id, person_id) tuples.
+    """
+    if path is None:
+        return None
+    return [(movie_id, person_id) for movie_id, person_id in path]
+
+
+def reverse_path(path, source):
+    """
+    Returns the path from the end of `path` back to `source`, the person
+    it started from.
+    """
+    if path is None:
+        return None
+    people = [source] + [person_id for movie_id, person_id in path]
+    return [
+        (path[i][0], people[i])
+        for i in range(len(path) - 1, -1, -1)
+    ]
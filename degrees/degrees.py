@@ -1,22 +1,162 @@
 import csv
+import math
+import os
 import sys
+from bisect import insort
 
+from cache import PathCache
+from filters import parse_year
+from graph import load_graph
+from journal import append_rows, apply_batch, read_journal, record_batch, remove_journal
+from landmarks import Landmarks, build_landmarks
+from nameindex import ranked_matches
+from snapshot import fingerprint, load_snapshot, save_snapshot, snapshot_path
 from util import Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
 names = {}
 
+# Sorted keys of `names`, for prefix and fuzzy lookups
+name_keys = []
+
 # Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
 people = {}
 
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Compact integer-indexed graph, used instead of `people` and `movies` when loaded
+graph = None
+
+# Landmark distances over `graph`, used to bound and prune searches when loaded
+landmarks = None
+
+# Recently found shortest paths, used to answer repeated queries when loaded
+path_cache = None
+
+
+class SearchLimitReached(Exception):
+    """
+    Raised when a search would expand more people than it is allowed to.
+    """
+
+
+class ShortestPaths():
+    """
+    Every shortest path between two states, as found by `layered_search`.
+
+    `forward` maps each state reached from the source to its (action,
+    parent) steps from the previous layer, and `backward` does the same
+    for the target. Every shortest path runs through exactly one of the
+    `meetings`. If given, `translate(action, state)` converts each step
+    of a path before it is returned.
+    """
+
+    def __init__(self, forward, backward, meetings, translate=None):
+        self.forward = forward
+        self.backward = backward
+        self.meetings = meetings
+        self.translate = translate
+
+    def paths(self):
+        """
+        Yields every shortest list of (action, state) pairs from the
+        source to the target, one at a time.
+        """
+        for meeting in self.meetings:
+            for first in self.paths_to(meeting):
+                for second in self.paths_from(meeting):
+                    path = first + second
+                    if self.translate is not None:
+                        path = [self.translate(action, state) for action, state in path]
+                    yield path
+
+    def paths_to(self, state):
+        """
+        Yields every shortest path from the source to `state`.
+        """
+        if not self.forward[state]:
+            yield []
+            return
+        for action, parent in self.forward[state]:
+            for path in self.paths_to(parent):
+                yield path + [(action, state)]
+
+    def paths_from(self, state):
+        """
+        Yields every shortest path from `state` to the target.
+        """
+        if not self.backward[state]:
+            yield []
+            return
+        for action, parent in self.backward[state]:
+            for path in self.paths_from(parent):
+                yield [(action, parent)] + path
+
+    def count(self):
+        """
+        Returns the number of shortest paths, without listing them.
+        """
+        forward = {}
+        backward = {}
+        return sum(
+            count_paths(self.forward, meeting, forward) * count_paths(self.backward, meeting, backward)
+            for meeting in self.meetings
+        )
+
+
+def count_paths(parents, state, counts):
+    """
+    Returns the number of paths from the root of `parents` to `state`,
+    remembering the count for every state in `counts`.
+    """
+    if state not in counts:
+        steps = parents[state]
+        if not steps:
+            counts[state] = 1
+        else:
+            counts[state] = sum(count_paths(parents, parent, counts) for action, parent in steps)
+    return counts[state]
+
 
-def load_data(directory):
+def load_data(directory, backend="dict", snapshot=True):
     """
     Load data from CSV files into memory.
+
+    With the "dict" backend, fills `names`, `people` and `movies`. With
+    the "csr" backend, loads a compact `graph` instead, memory-mapping it
+    from a snapshot of the CSV files when an up-to-date one exists and
+    writing one otherwise (unless `snapshot` is False).
     """
+    if backend == "csr":
+        global graph
+        sources = fingerprint(directory)
+        path = snapshot_path(directory)
+        graph = load_snapshot(directory, path, sources) if snapshot else None
+        if graph is not None:
+            graph.numbered = sources
+
+        # Rows added since the snapshot was taken are replayed from its journal
+        if graph is None and snapshot:
+            base, batches = read_journal(directory)
+            if batches and batches[-1]["sources"] == sources:
+                graph = load_snapshot(directory, path, base)
+                if graph is not None:
+                    graph.numbered = base
+                    for batch in batches:
+                        apply_batch(graph, batch)
+
+        if graph is None:
+            graph = load_graph(directory)
+            graph.numbered = sources
+            if snapshot:
+                try:
+                    save_snapshot(graph, path, sources)
+                    remove_journal(directory)
+                except OSError:
+                    pass
+        return
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -30,6 +170,7 @@ def load_data(directory):
                 names[row["name"].lower()] = {row["id"]}
             else:
                 names[row["name"].lower()].add(row["id"])
+    name_keys[:] = sorted(names)
 
     # Load movies
     with open(f"{directory}/movies.csv", encoding="utf-8") as f:
@@ -52,14 +193,181 @@ def load_data(directory):
                 pass
 
 
+def load_landmarks(directory, k=16):
+    """
+    Load distances from `k` landmark people to everyone in `graph`,
+    reading them from disk when up to date and computing them otherwise.
+    """
+    global landmarks
+
+    # People are numbered by sorting when the graph is loaded from the CSV files, and
+    # in the order they were added after that, so the distances depend on both
+    key = [fingerprint(directory), k, graph.numbered]
+    path = landmarks_path(directory)
+    landmarks = Landmarks.load(path, key)
+    if landmarks is None:
+        landmarks = build_landmarks(graph, k)
+        landmarks.key = key
+        try:
+            landmarks.save(path)
+        except OSError:
+            pass
+
+
+def landmarks_path(directory):
+    return os.path.join(directory, "degrees.landmarks")
+
+
+def load_cache(directory, maxsize=10000, persist=True):
+    """
+    Start caching up to `maxsize` shortest paths for the data in
+    `directory`. If `persist` is True, fill the cache from disk when it
+    was saved for the same data, and keep it there with `save_cache`.
+    """
+    global path_cache
+    path = os.path.join(directory, "degrees.paths") if persist else None
+    path_cache = PathCache(maxsize, fingerprint(directory), path)
+    path_cache.load()
+
+
+def save_cache():
+    """
+    Write the path cache to disk, if it was loaded with `persist`.
+    """
+    if path_cache is not None:
+        path_cache.save()
+
+
+def add_data(directory, new_people=(), new_movies=(), new_stars=()):
+    """
+    Add rows to the CSV files in `directory` and to the data loaded from
+    them, without loading it again. Rows are dictionaries keyed by the
+    CSV columns. People or movies with known ids are skipped, as are stars
+    for unknown people or movies.
+
+    Also records the rows in the snapshot's journal, brings landmark
+    distances up to date, and drops only the cached paths that the new
+    stars could make shorter.
+    """
+    if graph is None:
+        known_person = people.__contains__
+        known_movie = movies.__contains__
+    else:
+        known_person = lambda person_id: graph.person_index(person_id) is not None
+        known_movie = lambda movie_id: graph.movie_index(movie_id) is not None
+    new_people = list(unique(row for row in new_people if not known_person(row["id"])))
+    new_movies = list(unique(row for row in new_movies if not known_movie(row["id"])))
+
+    # Stars for people or movies that do not exist would be dropped on loading anyway
+    person_ids = {row["id"] for row in new_people}
+    movie_ids = {row["id"] for row in new_movies}
+    new_stars = [
+        row for row in new_stars
+        if (row["person_id"] in person_ids or known_person(row["person_id"]))
+        and (row["movie_id"] in movie_ids or known_movie(row["movie_id"]))
+    ]
+    if not new_people and not new_movies and not new_stars:
+        return
+
+    before = fingerprint(directory)
+    person_rows = append_rows(directory, "people.csv", new_people)
+    movie_rows = append_rows(directory, "movies.csv", new_movies)
+    append_rows(directory, "stars.csv", new_stars)
+    sources = fingerprint(directory)
+
+    if graph is None:
+        for row in new_people:
+            people[row["id"]] = {"name": row["name"], "birth": row["birth"], "movies": set()}
+            if row["name"].lower() not in names:
+                names[row["name"].lower()] = set()
+                insort(name_keys, row["name"].lower())
+            names[row["name"].lower()].add(row["id"])
+        for row in new_movies:
+            movies[row["id"]] = {"title": row["title"], "year": row["year"], "stars": set()}
+        for row in new_stars:
+            try:
+                people[row["person_id"]]["movies"].add(row["movie_id"])
+                movies[row["movie_id"]]["stars"].add(row["person_id"])
+            except KeyError:
+                pass
+    else:
+        batch = {
+            "sources": sources,
+            "people": [[row["id"], row["name"], offset] for row, offset in zip(new_people, person_rows)],
+            "movies": [
+                [row["id"], offset, parse_year(row["year"])]
+                for row, offset in zip(new_movies, movie_rows)
+            ],
+            "stars": [[row["person_id"], row["movie_id"]] for row in new_stars]
+        }
+        changed = apply_batch(graph, batch)
+        if os.path.exists(snapshot_path(directory)):
+            record_batch(directory, before, batch)
+
+        if landmarks is not None:
+            landmarks.update(graph, changed)
+            landmarks.key = [sources, landmarks.key[1], graph.numbered]
+            try:
+                landmarks.save(landmarks_path(directory))
+            except OSError:
+                pass
+
+    if path_cache is not None:
+        # Any shorter path has to go through someone who just got a new movie
+        starred = {row["person_id"] for row in new_stars}
+        path_cache.discard(lambda source, target, path: could_shorten(source, target, path, starred))
+        path_cache.fingerprint = sources
+        path_cache.save()
+
+
+def unique(rows):
+    """
+    Yields the rows with ids not seen in an earlier row.
+    """
+    seen = set()
+    for row in rows:
+        if row["id"] not in seen:
+            seen.add(row["id"])
+            yield row
+
+
+def could_shorten(source, target, path, starred):
+    """
+    Returns False if new movies for the people in `starred` certainly
+    leave `path` a shortest path from source to target, and True if they
+    might not.
+    """
+    if path is not None and len(path) <= 1:
+        return False
+    if landmarks is None:
+        return True
+
+    # A shorter path through a person is at least as long as the bounds through them
+    start = graph.person_index(source)
+    goal = graph.person_index(target)
+    if start is None or goal is None:
+        return True
+    length = math.inf if path is None else len(path)
+    for person_id in starred:
+        person = graph.person_index(person_id)
+        if person is None:
+            continue
+        if landmarks.bounds(start, person)[0] + landmarks.bounds(person, goal)[0] < length:
+            return True
+    return False
+
+
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    args = sys.argv[1:]
+    backend = "csr" if "--csr" in args else "dict"
+    args = [arg for arg in args if arg != "--csr"]
+    if len(args) > 1:
+        sys.exit("Usage: python degrees.py [--csr] [directory]")
+    directory = args[0] if len(args) == 1 else "large"
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(directory, backend)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -78,60 +386,299 @@ def main():
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = person_info(path[i][1])["name"]
+            person2 = person_info(path[i + 1][1])["name"]
+            movie = movie_info(path[i + 1][0])["title"]
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, max_expansions=None, movie_filter=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
+
+    Searches from the source and the target at the same time, always
+    growing the smaller of the two frontiers by one whole layer, and
+    stops as soon as the two searches meet in the middle. Raises
+    SearchLimitReached rather than expand more than `max_expansions`
+    people, if given.
+
+    If given, only movies that the MovieFilter `movie_filter` allows
+    connect people. Filtered paths are not cached.
     """
+    if path_cache is None or movie_filter is not None:
+        return search(source, target, max_expansions, movie_filter)
 
-    # Add first node to frontier
-    start = Node(state=source, parent=None, action=None)
-    frontier = QueueFrontier()
-    frontier.add(start)
+    found, path = path_cache.get(source, target)
+    if not found:
+        path = search(source, target, max_expansions)
+        path_cache.put(source, target, path)
+    return path
 
-    explored = set()
-    
-    while True:
-        if frontier.empty():
-            return None
-        
-        # Remove node from frontier
-        node = frontier.remove()
-
-        # Add removed node to the explored set
-        explored.add(node.state)
-
-        if node.state == target:
-            return []
-
-        # Iterates through every neigbor
-        for movie_id, person_id in neighbors_for_person(node.state):
-            # If frontier and explored set doesn't contain person then create a new node and add it to frontier if it isn't the target
-            if not frontier.contains_state(person_id) and person_id not in explored:
-                child = Node(state=person_id, parent=node, action=movie_id)
-                
-                # If node is the target, then go back through the tree and add every previous action and state
-                if child.state == target: 
-                    pairs = []
-                    while child.parent is not None:
-                        pairs.append((child.action, child.state))
-                        child = child.parent
-                    pairs.reverse()
-                    return pairs
-                
-                # Adds node to frontier if it isn't the target
-                frontier.add(child)
-
-    # TODO
-    raise NotImplementedError
+
+def search(source, target, max_expansions=None, movie_filter=None):
+    """
+    Finds the shortest path for `shortest_path`, without the cache.
+    """
+    if graph is None:
+        neighbors = neighbors_for_person
+        if movie_filter is not None:
+            neighbors = lambda person_id: neighbors_for_person(person_id, movie_filter)
+        return bidirectional_search(source, target, neighbors, max_expansions=max_expansions)
+
+    # Search over the graph's integers and translate the path back to ids
+    start = graph.person_index(source)
+    goal = graph.person_index(target)
+    if start is None or goal is None:
+        return None
+    space = search_space(start, goal, movie_filter)
+    if space is None:
+        return None
+
+    path = bidirectional_search(start, goal, *space, max_expansions)
+    if path is None:
+        return None
+    return [(graph.movie_ids[movie], graph.person_ids[person]) for movie, person in path]
+
+
+def search_space(start, goal, movie_filter=None):
+    """
+    Returns the neighbor function and the pruning function (or None) to
+    search `graph` from the integer `start` to `goal` with, or None if
+    the landmarks show they are not connected.
+    """
+    neighbors = graph.neighbors
+    if movie_filter is not None:
+        neighbors = lambda person: graph.neighbors(person, movie_filter)
+    if landmarks is None:
+        return neighbors, None
+
+    lower, upper = landmarks.bounds(start, goal)
+    if lower == math.inf:
+        return None
+
+    # Filtering only lengthens paths, so `upper` bounds unfiltered ones alone
+    if movie_filter is not None:
+        return neighbors, None
+
+    # Skip anyone who cannot be on a path of at most `upper` degrees
+    def prune(person, depth, forward):
+        if forward:
+            return depth + landmarks.bounds(person, goal)[0] > upper
+        return depth + landmarks.bounds(start, person)[0] > upper
+
+    return neighbors, prune
+
+
+def shortest_paths(source, target, max_expansions=None, movie_filter=None):
+    """
+    Returns the ShortestPaths from the source to the target, found by
+    a single search, from which every shortest path can be listed or
+    counted. Takes the same limits as `shortest_path`.
+    """
+    if graph is None:
+        neighbors = neighbors_for_person
+        if movie_filter is not None:
+            neighbors = lambda person_id: neighbors_for_person(person_id, movie_filter)
+        return layered_search(source, target, neighbors, max_expansions=max_expansions)
+
+    start = graph.person_index(source)
+    goal = graph.person_index(target)
+    if start is None or goal is None:
+        return ShortestPaths({}, {}, [])
+    space = search_space(start, goal, movie_filter)
+    if space is None:
+        return ShortestPaths({}, {}, [])
+
+    paths = layered_search(start, goal, *space, max_expansions)
+    paths.translate = lambda movie, person: (graph.movie_ids[movie], graph.person_ids[person])
+    return paths
+
+
+def all_shortest_paths(source, target, max_expansions=None, movie_filter=None):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs that
+    connect the source to the target, or nothing if there is none.
+    The search runs once, when the first path is asked for.
+    """
+    yield from shortest_paths(source, target, max_expansions, movie_filter).paths()
+
+
+def count_shortest_paths(source, target, max_expansions=None, movie_filter=None):
+    """
+    Returns how many shortest paths connect the source to the target,
+    without listing them.
+    """
+    return shortest_paths(source, target, max_expansions, movie_filter).count()
+
+
+def bidirectional_search(source, target, neighbors, prune=None, max_expansions=None):
+    """
+    Returns the shortest list of (action, state) pairs that connect the
+    source to the target, where `neighbors(state)` yields the
+    (action, state) pairs reachable from a state in one step.
+
+    If given, `prune(state, depth, forward)` is called for each newly
+    reached state, and states it returns True for are not searched. It
+    must only return True for states on no shortest path.
+
+    If no possible path, returns None. Raises SearchLimitReached rather
+    than expand more than `max_expansions` states, if given.
+    """
+    if source == target:
+        return []
+
+    # Maps every person reached so far to the node that reached them
+    forward = {source: Node(state=source, parent=None, action=None)}
+    backward = {target: Node(state=target, parent=None, action=None)}
+
+    forward_frontier = QueueFrontier()
+    forward_frontier.add(forward[source])
+    backward_frontier = QueueFrontier()
+    backward_frontier.add(backward[target])
+    forward_size = backward_size = 1
+    forward_depth = backward_depth = 0
+    expansions = 0
+
+    while forward_size > 0 and backward_size > 0:
+        # Check the budget before growing a layer, whose size is already known
+        expansions += min(forward_size, backward_size)
+        if max_expansions is not None and expansions > max_expansions:
+            raise SearchLimitReached(f"search would expand more than {max_expansions} people")
+
+        # Grow whichever side has fewer people waiting to be expanded
+        if forward_size <= backward_size:
+            forward_depth += 1
+            meeting, forward_size = expand_layer(
+                forward_frontier, forward, backward, neighbors,
+                prune and (lambda state: prune(state, forward_depth, True))
+            )
+        else:
+            backward_depth += 1
+            meeting, backward_size = expand_layer(
+                backward_frontier, backward, forward, neighbors,
+                prune and (lambda state: prune(state, backward_depth, False))
+            )
+
+        if meeting is not None:
+            return join_paths(forward[meeting], backward[meeting])
+
+    return None
+
+
+def layered_search(source, target, neighbors, prune=None, max_expansions=None):
+    """
+    Searches like `bidirectional_search`, but keeps every step that
+    reaches a state on a shortest path, and returns the ShortestPaths
+    from the source to the target.
+
+    Each side records, for every state it reaches, all the (action,
+    parent) steps into it from the previous layer. The searches stop
+    after the first layer that meets the other side, and every state
+    reached by both is then a meeting point of shortest paths.
+    """
+    forward = {source: []}
+    backward = {target: []}
+    if source == target:
+        return ShortestPaths(forward, backward, [source])
+
+    forward_layer = [source]
+    backward_layer = [target]
+    forward_depth = backward_depth = 0
+    expansions = 0
+
+    while forward_layer and backward_layer:
+        expansions += min(len(forward_layer), len(backward_layer))
+        if max_expansions is not None and expansions > max_expansions:
+            raise SearchLimitReached(f"search would expand more than {max_expansions} people")
+
+        if len(forward_layer) <= len(backward_layer):
+            forward_depth += 1
+            forward_layer = expand_parents(
+                forward_layer, forward, neighbors,
+                prune and (lambda state: prune(state, forward_depth, True))
+            )
+            meetings = [state for state in forward_layer if state in backward]
+        else:
+            backward_depth += 1
+            backward_layer = expand_parents(
+                backward_layer, backward, neighbors,
+                prune and (lambda state: prune(state, backward_depth, False))
+            )
+            meetings = [state for state in backward_layer if state in forward]
+
+        if meetings:
+            return ShortestPaths(forward, backward, meetings)
+
+    return ShortestPaths({}, {}, [])
+
+
+def expand_parents(layer, parents, neighbors, prune=None):
+    """
+    Expands every state in `layer`, recording in `parents` each step
+    into a state not reached before, unless `prune(state)` is True.
+    Returns the states of the next layer.
+    """
+    steps = {}
+    for state in layer:
+        for action, child in neighbors(state):
+            if child in steps:
+                steps[child].append((action, state))
+            elif child not in parents and (prune is None or not prune(child)):
+                steps[child] = [(action, state)]
+    parents.update(steps)
+    return list(steps)
+
+
+def expand_layer(frontier, reached, other, neighbors, prune=None):
+    """
+    Expands every node currently on `frontier` by one step, recording
+    newly reached people in `reached` unless `prune(person)` is True.
+
+    Returns the person at which this search meets the `other` search
+    (or None) and the number of nodes left on the frontier.
+    """
+    layer = []
+    while not frontier.empty():
+        layer.append(frontier.remove())
+
+    size = 0
+    for node in layer:
+        for movie_id, person_id in neighbors(node.state):
+            if person_id in reached or (prune is not None and prune(person_id)):
+                continue
+            child = Node(state=person_id, parent=node, action=movie_id)
+            reached[person_id] = child
+
+            # The first person reached by both searches completes a shortest path
+            if person_id in other:
+                return person_id, size
+            frontier.add(child)
+            size += 1
+
+    return None, size
+
+
+def join_paths(forward_node, backward_node):
+    """
+    Joins the source-side and target-side halves of a path that meet at
+    the same person into a single list of (movie_id, person_id) pairs.
+    """
+    # Walk back to the source, then reverse to get the first half in order
+    pairs = []
+    while forward_node.parent is not None:
+        pairs.append((forward_node.action, forward_node.state))
+        forward_node = forward_node.parent
+    pairs.reverse()
+
+    # Each backward node was reached from its parent, which is one step closer to the target
+    while backward_node.parent is not None:
+        pairs.append((backward_node.action, backward_node.parent.state))
+        backward_node = backward_node.parent
+
+    return pairs
 
 
 def person_id_for_name(name):
@@ -139,36 +686,107 @@ def person_id_for_name(name):
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
-    if len(person_ids) == 0:
-        return None
-    elif len(person_ids) > 1:
-        print(f"Which '{name}'?")
-        for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
-            print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
-        try:
-            person_id = input("Intended Person ID: ")
-            if person_id in person_ids:
-                return person_id
-        except ValueError:
-            pass
-        return None
+    if graph is None:
+        person_ids = list(names.get(name.lower(), set()))
     else:
+        person_ids = [graph.person_ids[person] for person in graph.people_named(name)]
+    if len(person_ids) == 0:
+        # Offer the closest names instead
+        person_ids = person_ids_like(name)
+        if len(person_ids) == 0:
+            return None
+        print(f"No one named '{name}'. Did you mean:")
+    elif len(person_ids) == 1:
         return person_ids[0]
+    else:
+        print(f"Which '{name}'?")
+
+    for person_id in person_ids:
+        person = person_info(person_id)
+        name = person["name"]
+        birth = person["birth"]
+        print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
+    try:
+        person_id = input("Intended Person ID: ")
+        if person_id in person_ids:
+            return person_id
+    except ValueError:
+        pass
+    return None
+
+
+def person_ids_like(name, limit=10, max_distance=2):
+    """
+    Returns the IMDB ids of up to `limit` people whose names best match
+    `name`: exact matches, then names starting with it, then names within
+    `max_distance` typos of it.
+    """
+    if graph is not None:
+        return [graph.person_ids[person] for person in graph.people_like(name, limit, max_distance)]
+    person_ids = []
+    for i in ranked_matches(name_keys, name.lower(), limit, max_distance):
+        person_ids.extend(sorted(names[name_keys[i]]))
+    return person_ids[:limit]
+
+
+def degrees_of_separation(source, target):
+    """
+    Returns (lower, upper) bounds on the number of degrees of separation
+    between two people, using only the loaded landmark distances.
+
+    Both bounds are math.inf if the people are known not to be connected,
+    or either is not in the data, and `upper` is math.inf if no landmark
+    reaches them both. Raises RuntimeError if no landmarks are loaded.
+    """
+    if landmarks is None:
+        raise RuntimeError("no landmarks are loaded; call load_landmarks first")
+    start = graph.person_index(source)
+    goal = graph.person_index(target)
+    if start is None or goal is None:
+        return math.inf, math.inf
+    if start == goal:
+        return 0, 0
+    return landmarks.bounds(start, goal)
+
+
+def person_info(person_id):
+    """
+    Returns a dictionary with the name and birth of a person.
+    """
+    if graph is None:
+        return people[person_id]
+    return graph.person(graph.person_index(person_id))
+
+
+def movie_info(movie_id):
+    """
+    Returns a dictionary with the title and year of a movie.
+    """
+    if graph is None:
+        return movies[movie_id]
+    return graph.movie(graph.movie_index(movie_id))
 
 
-def neighbors_for_person(person_id):
+def neighbors_for_person(person_id, movie_filter=None):
     """
     Returns (movie_id, person_id) pairs for people
-    who starred with a given person.
+    who starred with a given person, in movies that
+    `movie_filter` allows, if given.
     """
+    if graph is not None:
+        return {
+            (graph.movie_ids[movie], graph.person_ids[person])
+            for movie, person in graph.neighbors(graph.person_index(person_id), movie_filter)
+        }
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
+        stars = movies[movie_id]["stars"]
+        if movie_filter is not None and not movie_filter.allows(
+            parse_year(movies[movie_id]["year"]), len(stars)
+        ):
+            continue
+        for person_id in stars:
             neighbors.add((movie_id, person_id))
     return neighbors
 
@@ -0,0 +1,58 @@
+class MovieFilter():
+    """
+    Restricts a search to the movies released from `min_year` to
+    `max_year` with at most `max_cast` stars, where any bound may be None.
+    Movies with an unknown year are skipped whenever a year bound is given.
+
+    If given, `predicate(year, cast)` is also called for each remaining
+    movie, with its year (0 if unknown) and number of stars, and movies
+    it returns False for are skipped.
+    """
+
+    def __init__(self, min_year=None, max_year=None, max_cast=None, predicate=None):
+        self.min_year = min_year
+        self.max_year = max_year
+        self.max_cast = max_cast
+        self.predicate = predicate
+
+    def __repr__(self):
+        return (
+            f"MovieFilter(min_year={self.min_year}, max_year={self.max_year}, "
+            f"max_cast={self.max_cast}, predicate={self.predicate})"
+        )
+
+    def year_range(self):
+        """
+        Returns the (first, last) years allowed, or None if any year is.
+        """
+        if self.min_year is None and self.max_year is None:
+            return None
+        first = 1 if self.min_year is None else max(self.min_year, 1)
+        last = YEAR_MAX if self.max_year is None else min(self.max_year, YEAR_MAX)
+        return first, last
+
+    def allows(self, year, cast):
+        """
+        Returns True if a movie from `year` with `cast` stars is allowed.
+        """
+        years = self.year_range()
+        if years is not None and not years[0] <= year <= years[1]:
+            return False
+        if self.max_cast is not None and cast > self.max_cast:
+            return False
+        return self.predicate is None or self.predicate(year, cast)
+
+
+# Years are kept in 16-bit arrays, with 0 for unknown
+YEAR_MAX = 32767
+
+
+def parse_year(year):
+    """
+    Returns a movie's year as an integer, or 0 if it is unknown.
+    """
+    try:
+        year = int(year)
+    except ValueError:
+        return 0
+    return year if 0 < year <= YEAR_MAX else 0
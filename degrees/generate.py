@@ -0,0 +1,92 @@
+import argparse
+import csv
+import itertools
+import os
+import random
+
+FIRST_NAMES = [
+    "Ada", "Alan", "Alice", "Amir", "Ana", "Ben", "Carla", "Chen", "Dana", "David",
+    "Elena", "Emma", "Farah", "Grace", "Hana", "Ivan", "Jack", "Jin", "Kate", "Kevin",
+    "Lena", "Luca", "Maria", "Mei", "Nina", "Omar", "Paul", "Priya", "Rosa", "Sam",
+    "Sofia", "Tom", "Uma", "Victor", "Wei", "Yara", "Yusuf", "Zoe"
+]
+LAST_NAMES = [
+    "Bacon", "Brown", "Chen", "Cruise", "Diaz", "Evans", "Garcia", "Hanks", "Ito", "Jones",
+    "Khan", "Kim", "Lee", "Lopez", "Martin", "Meyer", "Nguyen", "Novak", "Okafor", "Patel",
+    "Rossi", "Sato", "Silva", "Smith", "Tanaka", "Taylor", "Wagner", "Walker", "Wong", "Young"
+]
+WORDS = [
+    "Apollo", "Dark", "Few", "Good", "Men", "Night", "Last", "Summer", "River", "City",
+    "Lost", "Star", "Road", "Storm", "Secret", "Blue", "Silent", "Iron", "Golden", "Return"
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic IMDB-like dataset for degrees.py."
+    )
+    parser.add_argument("directory", help="directory to write people.csv, movies.csv and stars.csv to")
+    parser.add_argument("--people", type=int, default=100000, help="number of people")
+    parser.add_argument("--movies", type=int, default=50000, help="number of movies")
+    parser.add_argument("--alpha", type=float, default=2.0,
+                        help="power-law exponent of cast sizes and of how often people are cast")
+    parser.add_argument("--max-cast", type=int, default=200, help="largest cast size")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    generate(args.directory, args.people, args.movies, args.alpha, args.max_cast, args.seed)
+
+
+def generate(directory, people, movies, alpha=2.0, max_cast=200, seed=0):
+    """
+    Writes `people` people and `movies` movies to CSV files in `directory`.
+
+    Cast sizes follow a power law with exponent `alpha`, so most movies
+    have a few stars and a few have very many. Stars are chosen with
+    power-law popularity too, so a few people appear in many movies.
+    """
+    if people < 1:
+        raise ValueError("a dataset needs at least one person")
+    if movies < 0:
+        raise ValueError(f"number of movies must not be negative: {movies}")
+    if alpha <= 1:
+        raise ValueError(f"power-law exponent must be above 1: {alpha}")
+    if max_cast < 1:
+        raise ValueError(f"largest cast size must be at least 1: {max_cast}")
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    with open(os.path.join(directory, "people.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for person in range(people):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            writer.writerow([person + 1, name, rng.randint(1900, 2010)])
+
+    with open(os.path.join(directory, "movies.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for movie in range(movies):
+            title = " ".join(rng.sample(WORDS, rng.randint(1, 3)))
+            writer.writerow([movie + 1, title, rng.randint(1920, 2024)])
+
+    # Popularity of person i falls off as a power of its rank
+    weights = itertools.accumulate(
+        (rank + 1) ** -(1 / alpha) for rank in range(people)
+    )
+    cumulative = list(weights)
+    ranking = list(range(1, people + 1))
+    rng.shuffle(ranking)
+
+    with open(os.path.join(directory, "stars.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for movie in range(movies):
+            cast = min(int(rng.paretovariate(alpha - 1)), max_cast, people)
+            stars = set(rng.choices(ranking, cum_weights=cumulative, k=cast))
+            for person_id in sorted(stars):
+                writer.writerow([person_id, movie + 1])
+
+
+if __name__ == "__main__":
+    main()
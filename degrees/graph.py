@@ -0,0 +1,445 @@
+import csv
+import os
+from array import array
+from bisect import bisect_left, bisect_right, insort
+
+from filters import parse_year
+from nameindex import scored_matches
+
+
+class Graph():
+    """
+    Compact co-star graph.
+
+    People and movies are interned to integers by sorting their IMDB ids,
+    so the integer for an id is its position in `person_ids` or
+    `movie_ids`. Adjacency is stored in CSR form: the movies of person `p`
+    are `person_movies[person_offsets[p]:person_offsets[p + 1]]`, and the
+    stars of movie `m` are `movie_people[movie_offsets[m]:movie_offsets[m + 1]]`.
+    Each person's movies are sorted by `movie_years`, the year of every
+    movie (0 if unknown), so the movies from a range of years are found
+    by bisection.
+
+    Names are indexed by `name_keys`, the sorted lowercased names, with
+    `name_people[i]` the person whose name is `name_keys[i]`.
+
+    Other fields are not kept in memory. Instead, `person_rows[p]` and
+    `movie_rows[m]` are the byte offsets of their rows in the CSV files
+    in `directory`, which are read again only when needed.
+
+    Rows added after the graph was built are kept in small `added_*`
+    dictionaries and lists alongside the CSR arrays, which never change.
+    New people and movies are numbered after the existing ones.
+    `numbered` is the fingerprint of the CSV files when everyone was
+    last numbered by sorting, set by whoever loads the graph.
+    """
+
+    def __init__(self, directory, person_ids, movie_ids,
+                 person_offsets, person_movies,
+                 movie_offsets, movie_people,
+                 name_keys, name_people,
+                 person_rows, movie_rows, movie_years):
+        self.directory = directory
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+        self.name_keys = name_keys
+        self.name_people = name_people
+        self.person_rows = person_rows
+        self.movie_rows = movie_rows
+        self.movie_years = movie_years
+        self.numbered = None
+
+        # Ids in sorted order, which `person_ids` and `movie_ids` start with
+        self.sorted_person_ids = person_ids
+        self.sorted_movie_ids = movie_ids
+
+        self.added_people = {}
+        self.added_movies = {}
+        self.added_person_movies = {}
+        self.added_movie_people = {}
+        self.added_person_rows = {}
+        self.added_movie_rows = {}
+        self.added_movie_years = {}
+        self.added_name_keys = []
+        self.added_name_people = []
+
+    def person_index(self, person_id):
+        """
+        Returns the integer for an IMDB person id, or None if unknown.
+        """
+        if person_id in self.added_people:
+            return self.added_people[person_id]
+        return find(self.sorted_person_ids, person_id)
+
+    def movie_index(self, movie_id):
+        """
+        Returns the integer for an IMDB movie id, or None if unknown.
+        """
+        if movie_id in self.added_movies:
+            return self.added_movies[movie_id]
+        return find(self.sorted_movie_ids, movie_id)
+
+    def person(self, person):
+        """
+        Returns the row of people.csv for a person, as a dictionary.
+        """
+        offset = self.added_person_rows.get(person)
+        if offset is None:
+            offset = self.person_rows[person]
+        return read_row(os.path.join(self.directory, "people.csv"), offset)
+
+    def movie(self, movie):
+        """
+        Returns the row of movies.csv for a movie, as a dictionary.
+        """
+        offset = self.added_movie_rows.get(movie)
+        if offset is None:
+            offset = self.movie_rows[movie]
+        return read_row(os.path.join(self.directory, "movies.csv"), offset)
+
+    def people_named(self, name):
+        """
+        Returns the people whose name matches `name`, ignoring case.
+        """
+        key = name.lower()
+        people = []
+        for keys, owners in [
+            (self.name_keys, self.name_people),
+            (self.added_name_keys, self.added_name_people)
+        ]:
+            i = bisect_left(keys, key)
+            while i < len(keys) and keys[i] == key:
+                people.append(owners[i])
+                i += 1
+        return people
+
+    def people_like(self, name, limit=10, max_distance=2):
+        """
+        Returns up to `limit` people whose names best match `name`,
+        ranked as by `nameindex.scored_matches`.
+        """
+        matches = []
+        for keys, owners in [
+            (self.name_keys, self.name_people),
+            (self.added_name_keys, self.added_name_people)
+        ]:
+            for rank, key, i in scored_matches(keys, name.lower(), limit, max_distance):
+                matches.append((rank, key, owners[i]))
+        return [person for rank, key, person in sorted(matches)[:limit]]
+
+    def movies(self, person):
+        """
+        Returns the movies a person starred in.
+        """
+        movies = ()
+        if person < len(self.person_offsets) - 1:
+            movies = self.person_movies[self.person_offsets[person]:self.person_offsets[person + 1]]
+        added = self.added_person_movies.get(person)
+        return movies if added is None else list(movies) + added
+
+    def movies_between(self, person, first, last):
+        """
+        Returns the movies a person starred in from year `first` to `last`.
+        """
+        movies = ()
+        if person < len(self.person_offsets) - 1:
+            start = self.person_offsets[person]
+            end = self.person_offsets[person + 1]
+            year = self.movie_years.__getitem__
+            low = bisect_left(self.person_movies, first, start, end, key=year)
+            high = bisect_right(self.person_movies, last, low, end, key=year)
+            movies = self.person_movies[low:high]
+        added = self.added_person_movies.get(person)
+        if added is None:
+            return movies
+        return list(movies) + [movie for movie in added if first <= self.year(movie) <= last]
+
+    def year(self, movie):
+        """
+        Returns the year of a movie, or 0 if it is unknown.
+        """
+        year = self.added_movie_years.get(movie)
+        return self.movie_years[movie] if year is None else year
+
+    def cast_size(self, movie):
+        """
+        Returns the number of people who starred in a movie.
+        """
+        size = 0
+        if movie < len(self.movie_offsets) - 1:
+            size = self.movie_offsets[movie + 1] - self.movie_offsets[movie]
+        return size + len(self.added_movie_people.get(movie, ()))
+
+    def stars(self, movie):
+        """
+        Returns the people who starred in a movie.
+        """
+        stars = ()
+        if movie < len(self.movie_offsets) - 1:
+            stars = self.movie_people[self.movie_offsets[movie]:self.movie_offsets[movie + 1]]
+        added = self.added_movie_people.get(movie)
+        return stars if added is None else list(stars) + added
+
+    def neighbors(self, person, movie_filter=None):
+        """
+        Yields (movie, person) integer pairs for people
+        who starred with a given person, in movies that
+        `movie_filter` allows, if given.
+        """
+        if movie_filter is None:
+            for movie in self.movies(person):
+                for star in self.stars(movie):
+                    yield movie, star
+            return
+
+        years = movie_filter.year_range()
+        movies = self.movies(person) if years is None else self.movies_between(person, *years)
+        for movie in movies:
+            if movie_filter.allows(self.year(movie), self.cast_size(movie)):
+                for star in self.stars(movie):
+                    yield movie, star
+
+    def add_person(self, person_id, name, offset):
+        """
+        Adds a person whose row starts at byte `offset` of people.csv,
+        and returns their integer.
+        """
+        if not isinstance(self.person_ids, Appended):
+            self.person_ids = Appended(self.sorted_person_ids)
+        person = len(self.person_ids)
+        self.person_ids.extra.append(person_id)
+        self.added_people[person_id] = person
+        self.added_person_rows[person] = offset
+
+        # Keep the added names sorted alongside the people they belong to
+        i = bisect_left(self.added_name_keys, name.lower())
+        self.added_name_keys.insert(i, name.lower())
+        self.added_name_people.insert(i, person)
+        return person
+
+    def add_movie(self, movie_id, offset, year=0):
+        """
+        Adds a movie from `year` whose row starts at byte `offset` of
+        movies.csv, and returns its integer.
+        """
+        if not isinstance(self.movie_ids, Appended):
+            self.movie_ids = Appended(self.sorted_movie_ids)
+        movie = len(self.movie_ids)
+        self.movie_ids.extra.append(movie_id)
+        self.added_movies[movie_id] = movie
+        self.added_movie_rows[movie] = offset
+        self.added_movie_years[movie] = year
+        return movie
+
+    def add_star(self, person, movie):
+        """
+        Records that a person starred in a movie. Returns False if that
+        was already known, and True otherwise.
+        """
+        if movie in self.movies(person):
+            return False
+        insort(self.added_person_movies.setdefault(person, []), movie, key=self.year)
+        insort(self.added_movie_people.setdefault(movie, []), person)
+        return True
+
+
+class Appended():
+    """
+    Read-only sequence of the items of `base` followed by those of `extra`.
+    """
+
+    def __init__(self, base, extra=None):
+        self.base = base
+        self.extra = [] if extra is None else extra
+
+    def __len__(self):
+        return len(self.base) + len(self.extra)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if i < len(self.base):
+            return self.base[i]
+        return self.extra[i - len(self.base)]
+
+
+class StringTable():
+    """
+    Read-only sequence of strings decoded on demand from a UTF-8 blob,
+    where string `i` is `blob[offsets[i]:offsets[i + 1]]`.
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    @classmethod
+    def from_strings(cls, strings):
+        offsets = array("q", [0])
+        blob = bytearray()
+        for string in strings:
+            blob += string.encode("utf-8")
+            offsets.append(len(blob))
+        return cls(offsets, bytes(blob))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+
+def find(ids, key):
+    """
+    Returns the position of `key` in the sorted sequence `ids`, or None.
+    """
+    i = bisect_left(ids, key)
+    if i < len(ids) and ids[i] == key:
+        return i
+    return None
+
+
+def read_rows(f):
+    """
+    Yields (offset, row) for each non-empty row of a CSV file opened in
+    binary mode, where `offset` is the byte position the row starts at.
+    """
+    offset = start = f.tell()
+    record = b""
+    for line in f:
+        if not record:
+            start = offset
+        record += line
+        offset += len(line)
+
+        # A quoted field may span lines, so wait until every quote is closed
+        if record.count(b'"') % 2 == 0:
+            row = next(csv.reader([record.decode("utf-8")]), [])
+            record = b""
+            if row:
+                yield start, row
+
+
+def read_row(path, offset):
+    """
+    Returns the row of a CSV file starting at byte `offset`,
+    as a dictionary keyed by the file's header.
+    """
+    with open(path, "rb") as f:
+        header = next(read_rows(f))[1]
+        f.seek(offset)
+        row = next(read_rows(f))[1]
+    return dict(zip(header, row))
+
+
+def read_table(path, columns):
+    """
+    Streams a CSV file, returning its values for each of `columns` as
+    lists and the byte offset of every row as an array.
+    """
+    values = [[] for column in columns]
+    offsets = array("q")
+    with open(path, "rb") as f:
+        rows = read_rows(f)
+        header = next(rows)[1]
+        indices = [header.index(column) for column in columns]
+        for offset, row in rows:
+            offsets.append(offset)
+            for column, i in zip(values, indices):
+                column.append(row[i])
+    return values, offsets
+
+
+def compress(sources, targets, count, key=None):
+    """
+    Builds CSR offsets and sorted, duplicate-free targets from parallel
+    arrays of edges, where sources are integers in range(count). Each
+    source's targets are sorted by `key`, if given.
+    """
+    # Counting sort the edges by source
+    offsets = array("i", [0]) * (count + 1)
+    for source in sources:
+        offsets[source + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+    position = array("i", offsets)
+    grouped = array("i", [0]) * len(targets)
+    for source, target in zip(sources, targets):
+        grouped[position[source]] = target
+        position[source] += 1
+
+    # Sort each source's targets and drop repeats
+    compressed = array("i")
+    for i in range(count):
+        start = offsets[i]
+        offsets[i] = len(compressed)
+        compressed.extend(sorted(set(grouped[start:offsets[i + 1]]), key=key))
+    offsets[count] = len(compressed)
+    return offsets, compressed
+
+
+def load_graph(directory):
+    """
+    Load data from CSV files into a compact Graph, streaming through the
+    files and keeping only what searching and name lookups need.
+    """
+    # Load people, interning their ids in sorted order
+    (ids, people_names), rows = read_table(f"{directory}/people.csv", ["id", "name"])
+    order = sorted(range(len(ids)), key=ids.__getitem__)
+    person_ids = [ids[i] for i in order]
+    person_rows = array("q", (rows[i] for i in order))
+    keys = sorted((people_names[i].lower(), person) for person, i in enumerate(order))
+    del ids, people_names, rows, order
+
+    # Index people by lowercased name
+    name_keys = StringTable.from_strings(key[0] for key in keys)
+    name_people = array("i", (key[1] for key in keys))
+    del keys
+
+    # Load movies the same way
+    (ids, years), rows = read_table(f"{directory}/movies.csv", ["id", "year"])
+    order = sorted(range(len(ids)), key=ids.__getitem__)
+    movie_ids = [ids[i] for i in order]
+    movie_rows = array("q", (rows[i] for i in order))
+    movie_years = array("h", (parse_year(years[i]) for i in order))
+    del ids, years, rows, order
+
+    # Load stars, dropping rows for unknown people or movies
+    stars_people = array("i")
+    stars_movies = array("i")
+    with open(f"{directory}/stars.csv", "rb") as f:
+        rows = read_rows(f)
+        header = next(rows)[1]
+        person_column = header.index("person_id")
+        movie_column = header.index("movie_id")
+        for offset, row in rows:
+            person = find(person_ids, row[person_column])
+            movie = find(movie_ids, row[movie_column])
+            if person is not None and movie is not None:
+                stars_people.append(person)
+                stars_movies.append(movie)
+
+    # Sort each person's movies by year, then by integer
+    person_offsets, person_movies = compress(
+        stars_people, stars_movies, len(person_ids),
+        key=lambda movie: (movie_years[movie], movie)
+    )
+    movie_offsets, movie_people = compress(stars_movies, stars_people, len(movie_ids))
+    del stars_people, stars_movies
+
+    return Graph(
+        directory,
+        StringTable.from_strings(person_ids), StringTable.from_strings(movie_ids),
+        person_offsets, person_movies,
+        movie_offsets, movie_people,
+        name_keys, name_people,
+        person_rows, movie_rows, movie_years
+    )
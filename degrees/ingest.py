@@ -0,0 +1,54 @@
+import argparse
+import csv
+import os
+
+import degrees
+from journal import remove_journal
+from snapshot import snapshot_path
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Add people, movies and stars to a degrees.py dataset in place."
+    )
+    parser.add_argument("directory", help="directory with people.csv, movies.csv and stars.csv")
+    parser.add_argument("--people", help="CSV file of people to add (id,name,birth)")
+    parser.add_argument("--movies", help="CSV file of movies to add (id,title,year)")
+    parser.add_argument("--stars", help="CSV file of stars to add (person_id,movie_id)")
+    parser.add_argument("--landmarks", type=int, default=0,
+                        help="number of landmarks whose saved distances to update")
+    parser.add_argument("--cache", type=int, default=0,
+                        help="size of the saved path cache to update")
+    parser.add_argument("--compact", action="store_true",
+                        help="rebuild the snapshot from the CSV files and clear its journal")
+    args = parser.parse_args()
+
+    if args.compact:
+        remove_journal(args.directory)
+        if os.path.exists(snapshot_path(args.directory)):
+            os.remove(snapshot_path(args.directory))
+
+    degrees.load_data(args.directory, "csr")
+    if args.landmarks:
+        degrees.load_landmarks(args.directory, args.landmarks)
+    if args.cache:
+        degrees.load_cache(args.directory, args.cache)
+
+    degrees.add_data(
+        args.directory,
+        read_csv(args.people), read_csv(args.movies), read_csv(args.stars)
+    )
+
+
+def read_csv(path):
+    """
+    Returns the rows of a CSV file as dictionaries, or none if no file is given.
+    """
+    if path is None:
+        return []
+    with open(path, encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+if __name__ == "__main__":
+    main()
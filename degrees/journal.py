@@ -0,0 +1,102 @@
+import csv
+import io
+import json
+import os
+
+from graph import read_rows
+
+
+def journal_path(directory):
+    """
+    Returns where rows added since the last snapshot are recorded.
+    """
+    return os.path.join(directory, "degrees.journal")
+
+
+def append_rows(directory, filename, rows):
+    """
+    Appends rows, given as dictionaries, to a CSV file in `directory`,
+    in the order of the file's header. Returns the byte offset at which
+    each appended row starts.
+    """
+    path = os.path.join(directory, filename)
+    offsets = []
+    with open(path, "rb+") as f:
+        header = next(read_rows(f))[1]
+
+        # Make sure the new rows start on a line of their own
+        end = f.seek(0, os.SEEK_END)
+        f.seek(end - 1)
+        if f.read(1) != b"\n":
+            f.seek(end)
+            f.write(b"\n")
+            end += 1
+
+        f.seek(end)
+        for row in rows:
+            line = io.StringIO()
+            csv.writer(line, lineterminator="\n").writerow([row.get(column, "") for column in header])
+            data = line.getvalue().encode("utf-8")
+            offsets.append(end)
+            f.write(data)
+            end += len(data)
+    return offsets
+
+
+def read_journal(directory):
+    """
+    Returns the fingerprint of the snapshot the journal in `directory`
+    builds on, and the batches of rows recorded since, or (None, []) if
+    there is no journal.
+    """
+    try:
+        with open(journal_path(directory), encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+    except (OSError, ValueError):
+        return None, []
+    if not lines:
+        return None, []
+    return lines[0]["base"], lines[1:]
+
+
+def record_batch(directory, before, batch):
+    """
+    Records a batch of added rows in the journal of `directory`, where
+    `before` is the fingerprint of the CSV files before they were added.
+    Starts a new journal if the current one does not end at `before`.
+    """
+    path = journal_path(directory)
+    base, batches = read_journal(directory)
+    end = batches[-1]["sources"] if batches else base
+    if end != before:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"base": before}) + "\n")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(batch) + "\n")
+
+
+def remove_journal(directory):
+    try:
+        os.remove(journal_path(directory))
+    except FileNotFoundError:
+        pass
+
+
+def apply_batch(graph, batch):
+    """
+    Adds a batch of rows to `graph`. Returns the movies whose casts grew.
+    """
+    for person_id, name, offset in batch["people"]:
+        if graph.person_index(person_id) is None:
+            graph.add_person(person_id, name, offset)
+    for movie_id, offset, year in batch["movies"]:
+        if graph.movie_index(movie_id) is None:
+            graph.add_movie(movie_id, offset, year)
+
+    movies = set()
+    for person_id, movie_id in batch["stars"]:
+        person = graph.person_index(person_id)
+        movie = graph.movie_index(movie_id)
+        if person is not None and movie is not None and graph.add_star(person, movie):
+            movies.add(movie)
+    return movies
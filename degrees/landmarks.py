@@ -0,0 +1,169 @@
+import math
+from array import array
+from collections import deque
+
+from storage import atomic_write, map_file, write_header
+
+# Bump whenever the layout of a landmarks file changes
+LANDMARKS_VERSION = 1
+
+MAGIC = b"DEGL"
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = 255
+
+
+class Landmarks():
+    """
+    Degrees-of-separation oracle over a Graph.
+
+    `distances[i][p]` is the number of degrees between landmark person
+    `landmarks[i]` and person `p`, or UNREACHABLE. By the triangle
+    inequality, every landmark gives a lower and an upper bound on the
+    distance between any two people, so bounds take O(k) lookups.
+
+    `key` identifies the graph and settings the distances belong to.
+    """
+
+    def __init__(self, landmarks, distances, key=None):
+        self.landmarks = landmarks
+        self.distances = distances
+        self.key = key
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the number of degrees between two
+        people. `upper` is math.inf if no landmark reaches both of them,
+        and both are math.inf if they are known not to be connected.
+        """
+        lower = 0
+        upper = math.inf
+        for distance in self.distances:
+            to_source = distance[source]
+            to_target = distance[target]
+            if to_source == UNREACHABLE and to_target == UNREACHABLE:
+                continue
+            if to_source == UNREACHABLE or to_target == UNREACHABLE:
+                return math.inf, math.inf
+            lower = max(lower, abs(to_source - to_target))
+            upper = min(upper, to_source + to_target)
+        return lower, upper
+
+    def update(self, graph, movies):
+        """
+        Brings the distances up to date after stars were added to `movies`
+        in `graph`, along with any people added to it.
+
+        Adding stars only ever brings people closer together, so only the
+        people whose distance to a landmark shrinks are visited.
+        """
+        for i, distance in enumerate(self.distances):
+            distance = array("B", distance)
+            distance.extend([UNREACHABLE] * (len(graph.person_ids) - len(distance)))
+
+            # Everyone in a movie is at most one step from its closest star
+            queue = deque()
+            for movie in movies:
+                stars = graph.stars(movie)
+                closest = min(distance[star] for star in stars)
+                if closest >= UNREACHABLE - 1:
+                    continue
+                for star in stars:
+                    if distance[star] > closest + 1:
+                        distance[star] = closest + 1
+                        queue.append(star)
+
+            # Pass the shorter distances on to everyone they reach
+            while queue:
+                person = queue.popleft()
+                if distance[person] + 1 >= UNREACHABLE:
+                    continue
+                for movie, star in graph.neighbors(person):
+                    if distance[star] > distance[person] + 1:
+                        distance[star] = distance[person] + 1
+                        queue.append(star)
+            self.distances[i] = distance
+
+    def save(self, path):
+        """
+        Writes the landmark distances and their `key` to `path`.
+        """
+        with atomic_write(path) as f:
+            write_header(f, MAGIC, LANDMARKS_VERSION, {"key": self.key, "landmarks": list(self.landmarks)})
+            for distance in self.distances:
+                f.write(distance)
+
+    @classmethod
+    def load(cls, path, key):
+        """
+        Memory-maps the landmark distances at `path`, or returns None if
+        there are none or they were saved with a different `key`.
+        """
+        mapped = map_file(path, MAGIC, LANDMARKS_VERSION)
+        if mapped is None:
+            return None
+        data, header, start = mapped
+        if header.get("key") != key:
+            data.close()
+            return None
+
+        landmarks = header["landmarks"]
+        view = memoryview(data)
+        count = (len(data) - start) // len(landmarks) if landmarks else 0
+        distances = [
+            view[start + i * count:start + (i + 1) * count]
+            for i in range(len(landmarks))
+        ]
+        return cls(landmarks, distances, key)
+
+
+def distances_from(graph, source):
+    """
+    Returns the number of degrees from `source` to every person in
+    `graph` as a byte array, using UNREACHABLE for people not connected.
+    """
+    distance = array("B", [UNREACHABLE]) * len(graph.person_ids)
+    distance[source] = 0
+
+    # Each movie's cast only needs to be scanned the first time it is reached
+    seen = bytearray(len(graph.movie_ids))
+    layer = [source]
+    depth = 0
+    while layer and depth < UNREACHABLE - 1:
+        depth += 1
+        next_layer = []
+        for person in layer:
+            for movie in graph.movies(person):
+                if seen[movie]:
+                    continue
+                seen[movie] = 1
+                for star in graph.stars(movie):
+                    if distance[star] == UNREACHABLE:
+                        distance[star] = depth
+                        next_layer.append(star)
+        layer = next_layer
+    return distance
+
+
+def build_landmarks(graph, k):
+    """
+    Picks up to `k` landmarks and computes their distances to everyone.
+
+    People who appear in the most movies are tried first, since they sit
+    near the middle of the graph and give tight upper bounds, skipping
+    anyone within two degrees of a landmark already picked.
+    """
+    candidates = sorted(
+        range(len(graph.person_ids)),
+        key=lambda person: -len(graph.movies(person))
+    )
+    landmarks = []
+    distances = []
+    for person in candidates:
+        if len(landmarks) == k or len(graph.movies(person)) == 0:
+            break
+        if any(distance[person] <= 2 for distance in distances):
+            continue
+        landmarks.append(person)
+        distances.append(distances_from(graph, person))
+    return Landmarks(landmarks, distances)
@@ -0,0 +1,101 @@
+from bisect import bisect_left
+
+
+def prefix_range(keys, prefix):
+    """
+    Returns the range of positions in the sorted sequence `keys`
+    holding the keys that start with `prefix`.
+    """
+    start = bisect_left(keys, prefix)
+    if not prefix:
+        return range(start, len(keys))
+
+    # Every key starting with `prefix` sorts before its successor
+    end = bisect_left(keys, prefix[:-1] + chr(min(ord(prefix[-1]) + 1, 0x10ffff)), start)
+    return range(start, end)
+
+
+def prefix_matches(keys, prefix, limit=None):
+    """
+    Returns the positions of up to `limit` keys starting with `prefix`.
+    """
+    matches = prefix_range(keys, prefix)
+    return list(matches if limit is None else matches[:limit])
+
+
+def fuzzy_matches(keys, query, max_distance):
+    """
+    Returns (distance, position) pairs for every key within `max_distance`
+    edits (insertions, deletions or substitutions) of `query`.
+
+    The sorted keys are walked as if they were a trie: the edit distance
+    table for a prefix is computed once and shared by every key with that
+    prefix, and once no completion of a prefix can be close enough, all
+    keys with that prefix are skipped with a binary search.
+    """
+    matches = []
+    rows = [list(range(len(query) + 1))]
+    previous = ""
+    i = 0
+    while i < len(keys):
+        key = keys[i]
+
+        # Keep the rows for the prefix this key shares with the last one
+        common = 0
+        limit = min(len(key), len(previous), len(rows) - 1)
+        while common < limit and key[common] == previous[common]:
+            common += 1
+        del rows[common + 1:]
+
+        for depth in range(common, len(key)):
+            row = next_row(rows[-1], key[depth], query)
+            rows.append(row)
+            if min(row) > max_distance:
+                previous = key[:depth + 1]
+                i = prefix_range(keys, previous).stop
+                break
+        else:
+            if rows[-1][-1] <= max_distance:
+                matches.append((rows[-1][-1], i))
+            previous = key
+            i += 1
+    return matches
+
+
+def next_row(row, char, query):
+    """
+    Returns the next row of the edit distance table between `query`
+    and a prefix, given the row for that prefix without `char`.
+    """
+    new_row = [row[0] + 1]
+    for j in range(1, len(query) + 1):
+        new_row.append(min(
+            new_row[j - 1] + 1,
+            row[j] + 1,
+            row[j - 1] + (query[j - 1] != char)
+        ))
+    return new_row
+
+
+def scored_matches(keys, query, limit=10, max_distance=2):
+    """
+    Returns (rank, key, position) for up to `limit` keys that best match
+    `query`, best first. Exact matches rank 0 and other keys starting with
+    `query` rank 1, while keys within `max_distance` edits of `query` rank
+    2 plus their distance.
+    """
+    ranked = {}
+    for i in prefix_range(keys, query)[:limit]:
+        ranked[i] = 0 if keys[i] == query else 1
+    for distance, i in fuzzy_matches(keys, query, max_distance):
+        ranked.setdefault(i, 2 + distance)
+    return sorted((rank, keys[i], i) for i, rank in ranked.items())[:limit]
+
+
+def ranked_matches(keys, query, limit=10, max_distance=2):
+    """
+    Returns the positions of up to `limit` keys that best match `query`:
+    exact matches first, then other keys starting with `query`, then keys
+    within `max_distance` edits of `query` from closest to farthest.
+    """
+    return [i for rank, key, i in scored_matches(keys, query, limit, max_distance)]
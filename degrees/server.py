@@ -0,0 +1,269 @@
+import argparse
+import asyncio
+import concurrent.futures
+import itertools
+import json
+import os
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import degrees
+from batch import resolve
+from filters import MovieFilter
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve degrees-of-separation queries over HTTP."
+    )
+    parser.add_argument("directory", help="directory with people.csv, movies.csv and stars.csv")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8050, help="port to listen on")
+    parser.add_argument("--unix", help="listen on this Unix socket instead of a port")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of search processes (default: one per core)")
+    parser.add_argument("--timeout", type=float, default=10.0,
+                        help="seconds before a request gives up")
+    parser.add_argument("--max-expansions", type=int, default=100000,
+                        help="most people one search may expand")
+    parser.add_argument("--cache", type=int, default=10000, help="number of paths to cache")
+    parser.add_argument("--landmarks", type=int, default=0,
+                        help="number of landmarks to prune searches with")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    degrees.load_data(args.directory, "csr")
+    if args.landmarks:
+        degrees.load_landmarks(args.directory, args.landmarks)
+    if args.cache:
+        degrees.load_cache(args.directory, args.cache)
+    print("Data loaded.")
+
+    server = Server(args.directory, args.workers, args.timeout, args.max_expansions, args.landmarks)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        degrees.save_cache()
+
+
+class Server():
+    """
+    HTTP server answering JSON queries against the loaded `degrees.graph`.
+
+    Requests are handled concurrently on one event loop. Name resolution
+    and the path cache live in this process, and searches run on a pool of
+    worker processes that memory-map the same graph snapshot. Each search
+    is limited to `max_expansions` people, so no query can hold a worker
+    for long, and each request gives up after `timeout` seconds.
+
+    Endpoints:
+        GET /path?source=...&target=...[&max_expansions=N]
+                  [&min_year=Y][&max_year=Y][&max_cast=N]
+        GET /paths?source=...&target=...[&limit=N] and the same options,
+            listing up to `limit` of all the shortest paths and their count
+        GET /names?name=...[&limit=N]
+        GET /stats
+    """
+
+    def __init__(self, directory, workers=None, timeout=10.0, max_expansions=100000, landmarks=0):
+        self.directory = directory
+        self.timeout = timeout
+        self.max_expansions = max_expansions
+        self.pool = concurrent.futures.ProcessPoolExecutor(
+            workers, initializer=start_worker, initargs=(directory, landmarks)
+        )
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+
+    async def serve(self, host, port, unix=None):
+        if unix:
+            server = await asyncio.start_unix_server(self.handle, unix)
+            print(f"Listening on {unix}")
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+            print(f"Listening on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.pool.shutdown(cancel_futures=True)
+            if unix and os.path.exists(unix):
+                os.remove(unix)
+
+    async def handle(self, reader, writer):
+        """
+        Reads one HTTP request from a connection and writes its response.
+        """
+        try:
+            request = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            status, body = await self.respond(request.decode("latin-1"))
+        except (ConnectionError, UnicodeDecodeError):
+            writer.close()
+            return
+
+        payload = json.dumps(body).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            "Connection: close\r\n\r\n".encode("latin-1") + payload
+        )
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    async def respond(self, request):
+        """
+        Returns the HTTP status and JSON body answering a request line.
+        """
+        self.requests += 1
+        try:
+            method, target, version = request.split()
+        except ValueError:
+            return self.error(HTTPStatus.BAD_REQUEST, "Malformed request.")
+        if method != "GET":
+            return self.error(HTTPStatus.METHOD_NOT_ALLOWED, "Only GET is supported.")
+
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        routes = {"/path": self.path, "/paths": self.paths, "/names": self.names, "/stats": self.stats}
+        if url.path not in routes:
+            return self.error(HTTPStatus.NOT_FOUND, f"Unknown endpoint: {url.path}")
+
+        try:
+            return await asyncio.wait_for(routes[url.path](query), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return self.error(HTTPStatus.GATEWAY_TIMEOUT, "Query timed out.")
+        except (KeyError, ValueError) as e:
+            return self.error(HTTPStatus.BAD_REQUEST, f"Bad query: {e}")
+
+    async def path(self, query):
+        max_expansions, movie_filter = self.limits(query)
+        source, target = query["source"], query["target"]
+        try:
+            source_id = resolve(source)
+            target_id = resolve(target)
+        except LookupError as e:
+            return self.error(HTTPStatus.NOT_FOUND, str(e))
+
+        # Only unfiltered paths are cached
+        cached = degrees.path_cache is not None and movie_filter is None
+        found, path = False, None
+        if cached:
+            found, path = degrees.path_cache.get(source_id, target_id)
+        if not found:
+            loop = asyncio.get_running_loop()
+            try:
+                path = await loop.run_in_executor(
+                    self.pool, degrees.search, source_id, target_id, max_expansions, movie_filter
+                )
+            except degrees.SearchLimitReached as e:
+                return self.error(HTTPStatus.UNPROCESSABLE_ENTITY, str(e))
+            if cached:
+                degrees.path_cache.put(source_id, target_id, path)
+
+        return HTTPStatus.OK, {
+            "source": source_id,
+            "target": target_id,
+            "degrees": None if path is None else len(path),
+            "path": path
+        }
+
+    async def paths(self, query):
+        max_expansions, movie_filter = self.limits(query)
+        limit = int(query.get("limit", 10))
+        source, target = query["source"], query["target"]
+        try:
+            source_id = resolve(source)
+            target_id = resolve(target)
+        except LookupError as e:
+            return self.error(HTTPStatus.NOT_FOUND, str(e))
+
+        loop = asyncio.get_running_loop()
+        try:
+            count, paths = await loop.run_in_executor(
+                self.pool, list_shortest_paths, source_id, target_id, limit, max_expansions, movie_filter
+            )
+        except degrees.SearchLimitReached as e:
+            return self.error(HTTPStatus.UNPROCESSABLE_ENTITY, str(e))
+
+        return HTTPStatus.OK, {
+            "source": source_id,
+            "target": target_id,
+            "degrees": len(paths[0]) if paths else None,
+            "count": count,
+            "paths": paths
+        }
+
+    def limits(self, query):
+        """
+        Returns the search budget and the MovieFilter (or None) a query asks for.
+        """
+        max_expansions = min(int(query.get("max_expansions", self.max_expansions)), self.max_expansions)
+        bounds = [
+            None if query.get(key) is None else int(query[key])
+            for key in ("min_year", "max_year", "max_cast")
+        ]
+        if all(bound is None for bound in bounds):
+            return max_expansions, None
+        return max_expansions, MovieFilter(*bounds)
+
+    async def names(self, query):
+        name = query["name"]
+        limit = int(query.get("limit", 10))
+        loop = asyncio.get_running_loop()
+        people = await loop.run_in_executor(self.pool, describe_people_like, name, limit)
+        return HTTPStatus.OK, {"name": name, "people": people}
+
+    async def stats(self, query):
+        return HTTPStatus.OK, {
+            "requests": self.requests,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "cache": None if degrees.path_cache is None else degrees.path_cache.stats()
+        }
+
+    def error(self, status, message):
+        self.errors += 1
+        return status, {"error": message}
+
+
+def start_worker(directory, landmarks):
+    """
+    Loads the graph in a worker process, mapping the server's snapshot.
+    """
+    degrees.load_data(directory, "csr")
+    if landmarks:
+        degrees.load_landmarks(directory, landmarks)
+
+
+def list_shortest_paths(source_id, target_id, limit, max_expansions, movie_filter):
+    """
+    Returns the number of shortest paths between two people and up to
+    `limit` of them, from a single search.
+    """
+    paths = degrees.shortest_paths(source_id, target_id, max_expansions, movie_filter)
+    return paths.count(), list(itertools.islice(paths.paths(), limit))
+
+
+def describe_people_like(name, limit):
+    """
+    Returns the ids, names and births of the people best matching `name`.
+    """
+    people = []
+    for person_id in degrees.person_ids_like(name, limit):
+        person = degrees.person_info(person_id)
+        people.append({"id": person_id, "name": person["name"], "birth": person["birth"]})
+    return people
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import os
+from array import array
+
+from graph import Graph, StringTable
+from storage import ALIGNMENT, atomic_write, map_file, write_header
+
+# Bump whenever the layout of a snapshot or of Graph changes
+SNAPSHOT_VERSION = 3
+
+MAGIC = b"DEGS"
+
+# Graph attributes stored as arrays, with their typecodes, and as tables of strings
+ARRAYS = [
+    ("person_offsets", "i"), ("person_movies", "i"),
+    ("movie_offsets", "i"), ("movie_people", "i"),
+    ("name_people", "i"), ("person_rows", "q"), ("movie_rows", "q"),
+    ("movie_years", "h")
+]
+STRINGS = ["person_ids", "movie_ids", "name_keys"]
+
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+
+
+def snapshot_path(directory):
+    """
+    Returns where the snapshot of a data directory is kept.
+    """
+    return os.path.join(directory, "degrees.snapshot")
+
+
+def fingerprint(directory):
+    """
+    Returns the size and modification time of each source CSV file,
+    which change whenever a snapshot of them goes stale.
+    """
+    stats = []
+    for filename in SOURCES:
+        stat = os.stat(os.path.join(directory, filename))
+        stats.append([filename, stat.st_size, stat.st_mtime_ns])
+    return stats
+
+
+def save_snapshot(graph, path, sources):
+    """
+    Writes `graph` to `path`, recording the fingerprint `sources`
+    of the files it was loaded from.
+    """
+    sections = []
+    for name, typecode in ARRAYS:
+        sections.append((name, array(typecode, getattr(graph, name)).tobytes()))
+    for name in STRINGS:
+        strings = getattr(graph, name)
+        if not isinstance(strings, StringTable):
+            strings = StringTable.from_strings(strings)
+        sections.append((name + ".offsets", array("q", strings.offsets).tobytes()))
+        sections.append((name + ".blob", bytes(strings.blob)))
+
+    # Lay sections out back to back, each aligned to 8 bytes
+    layout = {}
+    position = 0
+    for name, data in sections:
+        layout[name] = [position, len(data)]
+        position += len(data) + -len(data) % ALIGNMENT
+
+    with atomic_write(path) as f:
+        write_header(f, MAGIC, SNAPSHOT_VERSION, {"sources": sources, "sections": layout})
+        for name, data in sections:
+            f.write(data)
+            f.write(b"\0" * (-len(data) % ALIGNMENT))
+
+
+def load_snapshot(directory, path, sources):
+    """
+    Memory-maps the snapshot at `path` and returns the Graph it holds
+    for `directory`, or None if there is no snapshot or it does not
+    match the current version and the fingerprint `sources`.
+    """
+    mapped = map_file(path, MAGIC, SNAPSHOT_VERSION)
+    if mapped is None:
+        return None
+    data, header, start = mapped
+    if header.get("sources") != sources:
+        data.close()
+        return None
+
+    # Sections are views into the mapped file, so nothing is copied
+    view = memoryview(data)
+
+    def section(name, typecode=None):
+        offset, size = header["sections"][name]
+        chunk = view[start + offset:start + offset + size]
+        return chunk.cast(typecode) if typecode else chunk
+
+    fields = {}
+    for name, typecode in ARRAYS:
+        fields[name] = section(name, typecode)
+    for name in STRINGS:
+        fields[name] = StringTable(section(name + ".offsets", "q"), section(name + ".blob"))
+    return Graph(directory, **fields)
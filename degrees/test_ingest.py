@@ -0,0 +1,71 @@
+import csv
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Searches every pair of people with the saved landmarks, then without any
+CHECK = """
+import sys
+import degrees
+degrees.load_data(sys.argv[1], "csr")
+degrees.load_landmarks(sys.argv[1], 4)
+person_ids = list(degrees.graph.person_ids)
+pairs = [(source, target) for source in person_ids for target in person_ids]
+pruned = [degrees.search(source, target) for source, target in pairs]
+bounds = [degrees.degrees_of_separation(source, target) for source, target in pairs]
+degrees.landmarks = None
+wrong = 0
+for (source, target), path, (lower, upper) in zip(pairs, pruned, bounds):
+    expected = degrees.search(source, target)
+    length = float("inf") if expected is None else len(expected)
+    if path != expected or not lower <= length <= upper:
+        wrong += 1
+print(wrong)
+"""
+
+
+def run(*args):
+    return subprocess.run(
+        [sys.executable, *args], cwd=HERE, capture_output=True, text=True, check=True
+    ).stdout
+
+
+def write_csv(path, header, rows):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+class TestIngest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.data = os.path.join(self.directory, "data")
+        os.mkdir(self.data)
+        for filename in ["people.csv", "movies.csv", "stars.csv"]:
+            shutil.copy(os.path.join(HERE, "small", filename), self.data)
+
+    def test_compact_keeps_landmarks_correct(self):
+        # A person whose id sorts first moves everyone else once the CSV files are reloaded
+        people = os.path.join(self.directory, "new_people.csv")
+        stars = os.path.join(self.directory, "new_stars.csv")
+        write_csv(people, ["id", "name", "birth"], [["1", "New Person", "1990"]])
+        write_csv(stars, ["person_id", "movie_id"], [["1", "104257"]])
+
+        run("ingest.py", self.data, "--landmarks", "4")
+        run("ingest.py", self.data, "--people", people, "--stars", stars, "--landmarks", "4")
+        self.assertEqual(run("-c", CHECK, self.data).strip(), "0")
+
+        run("ingest.py", self.data, "--compact", "--landmarks", "4")
+        self.assertEqual(run("-c", CHECK, self.data).strip(), "0")
+
+
+if __name__ == "__main__":
+    unittest.main()
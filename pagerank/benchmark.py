@@ -0,0 +1,131 @@
+import argparse
+import json
+import random
+import resource
+import sys
+import time
+
+from crawler import Crawl
+from pagerank import DAMPING, SAMPLES, iterate_pagerank, sample_pagerank
+from solvers import NORMS
+
+# Convergence of the ranks the sampled ones are judged against, far tighter than any timed solve
+REFERENCE_TOLERANCE = 1e-8
+REFERENCE_NORM = "l1"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure how pagerank.py crawls, samples and iterates over a corpus."
+    )
+    parser.add_argument("corpus", help="directory of HTML pages")
+    parser.add_argument("--samples", type=int, default=SAMPLES, help="number of samples")
+    parser.add_argument("--walkers", type=int, default=1, help="number of surfers sharing the samples")
+    parser.add_argument("--method", choices=["jacobi", "gauss-seidel", "aitken", "quadratic", "adaptive"],
+                        default="jacobi", help="solver to iterate with")
+    parser.add_argument("--tolerance", type=float, default=0.001,
+                        help="change below which the iterated ranks have converged")
+    parser.add_argument("--norm", choices=sorted(NORMS), default="max",
+                        help="how the change in the iterated ranks is measured")
+    parser.add_argument("--top", type=int, default=10,
+                        help="number of top pages compared between sampling and iteration")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for sampling")
+    parser.add_argument("--output", help="file to write the JSON report to (default: stdout)")
+    args = parser.parse_args()
+
+    report = benchmark(
+        args.corpus, args.samples, args.walkers, args.method, args.tolerance, args.norm,
+        args.top, args.seed
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+def benchmark(directory, samples=SAMPLES, walkers=1, method="jacobi", tolerance=0.001, norm="max",
+              top=10, seed=0):
+    """
+    Crawls the corpus in `directory`, then ranks it by sampling and by
+    iteration, returning a report of how long each took, the peak
+    memory after each, and how far the sampled ranks are from ranks
+    iterated to convergence.
+
+    Every page is scanned, without reading or writing the corpus's link
+    index, so the crawl is timed the same way however often it is run.
+    """
+    report = {
+        "corpus": directory,
+        "samples": samples,
+        "walkers": walkers,
+        "method": method,
+        "tolerance": tolerance,
+        "norm": norm
+    }
+
+    start = time.perf_counter()
+    crawl = Crawl(directory, known={})
+    corpus = dict(crawl)
+    report["crawl"] = stage(start)
+    report["crawl"]["scanned"] = crawl.stats()["scanned"]
+    report["crawl"]["bytes"] = crawl.stats()["bytes"]
+
+    # Only include links to other pages in the corpus, as `pagerank.crawl` does
+    for page, links in corpus.items():
+        links.intersection_update(corpus)
+    report["pages"] = len(corpus)
+    report["links"] = sum(len(links) for links in corpus.values())
+    report["dangling"] = sum(1 for links in corpus.values() if not links)
+
+    random.seed(seed)
+    start = time.perf_counter()
+    sampled = sample_pagerank(corpus, DAMPING, samples, walkers)
+    report["sample"] = stage(start)
+
+    trace = []
+    start = time.perf_counter()
+    iterated = iterate_pagerank(corpus, DAMPING, method, tolerance, norm, trace)
+    report["iterate"] = stage(start)
+    report["iterate"]["iterations"] = len(trace)
+
+    reference = iterate_pagerank(corpus, DAMPING, "jacobi", REFERENCE_TOLERANCE, REFERENCE_NORM)
+    report["accuracy"] = compare(sampled, reference, top)
+    report["accuracy"]["iterate_total_variation"] = compare(iterated, reference, top)["total_variation"]
+    return report
+
+
+def stage(start):
+    """
+    Returns the seconds since `start`, and the peak memory so far.
+    """
+    return {
+        "seconds": time.perf_counter() - start,
+
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }
+
+
+def compare(estimated, reference, top=10):
+    """
+    Returns how far estimated ranks are from reference ones: the largest
+    and mean difference of any page, the total variation distance, and
+    the fraction of the `top` pages by reference also in the top pages
+    by estimate.
+    """
+    errors = [abs(estimated.get(page, 0.0) - rank) for page, rank in reference.items()]
+    best_estimated = sorted(estimated, key=estimated.get, reverse=True)[:top]
+    best_reference = sorted(reference, key=reference.get, reverse=True)[:top]
+    return {
+        "max_error": max(errors, default=0.0),
+        "mean_error": sum(errors) / len(errors) if errors else 0.0,
+        "total_variation": sum(errors) / 2,
+        "top_overlap": len(set(best_estimated) & set(best_reference)) / len(best_reference) if best_reference else 1.0
+    }
+
+
+if __name__ == "__main__":
+    main()
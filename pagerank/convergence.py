@@ -0,0 +1,50 @@
+import argparse
+import time
+
+from linkgraph import LinkGraph
+from pagerank import DAMPING, crawl
+from solvers import NORMS, solve
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Show how quickly each PageRank solver converges on a corpus."
+    )
+    parser.add_argument("corpus", help="directory of HTML pages")
+    parser.add_argument("--method", action="append",
+                        choices=["jacobi", "gauss-seidel", "aitken", "quadratic", "adaptive"],
+                        help="solver to run, given once per solver (default: all)")
+    parser.add_argument("--tolerance", type=float, default=0.001,
+                        help="change below which the ranks have converged")
+    parser.add_argument("--norm", choices=sorted(NORMS), default="max",
+                        help="how the change in the ranks is measured")
+    parser.add_argument("--max-iterations", type=int, default=None,
+                        help="most iterations to run")
+    parser.add_argument("--quiet", action="store_true", help="only print each solver's summary")
+    args = parser.parse_args()
+
+    graph = LinkGraph.from_corpus(crawl(args.corpus))
+    print(f"{len(graph)} pages, {len(graph.targets)} links, {len(graph.dangling)} dangling")
+    methods = args.method or ["jacobi", "gauss-seidel", "aitken", "quadratic", "adaptive"]
+    for method in methods:
+        trace = []
+        start = time.perf_counter()
+        solve(graph, DAMPING, method, args.tolerance, args.norm, trace=trace,
+              max_iterations=args.max_iterations)
+        seconds = time.perf_counter() - start
+
+        print(f"{method}: {len(trace)} iterations, {seconds:.3f}s")
+        if args.quiet:
+            continue
+
+        # How fast the residual shrinks shows which solver suits the corpus
+        previous = None
+        for i, step in enumerate(trace):
+            ratio = step["residual"] / previous if previous else None
+            rate = "" if ratio is None else f"  (x{ratio:.3f})"
+            print(f"  {i + 1:4d}: residual {step['residual']:.3e}, updated {step['updated']}{rate}")
+            previous = step["residual"]
+
+
+if __name__ == "__main__":
+    main()
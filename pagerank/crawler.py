@@ -0,0 +1,190 @@
+import argparse
+import concurrent.futures
+import os
+import re
+import time
+
+from linkgraph import LinkGraphBuilder
+from linkindex import index_path, load_index, save_index
+
+# Compiled once, and matched against raw bytes so files need not be decoded
+LINK = re.compile(rb"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
+CHUNK_SIZE = 1 << 16
+
+# Longest partial tag carried over from one chunk to the next
+MAX_TAG = 1 << 12
+
+# Files handed to a thread at a time, so small files are not swamped by scheduling
+FILES_PER_TASK = 64
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Crawl a directory of HTML pages and report how fast it was read."
+    )
+    parser.add_argument("corpus", help="directory of HTML pages")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="number of threads reading files (default: chosen by Python)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help="bytes of a file to scan at a time")
+    parser.add_argument("--no-index", action="store_true",
+                        help="scan every file, without reading or updating the link index")
+    args = parser.parse_args()
+
+    known = {} if args.no_index else load_index(index_path(args.corpus))
+    crawl = Crawl(args.corpus, args.threads, args.chunk_size, known)
+    graph = crawl_graph(crawl)
+    if not args.no_index:
+        crawl.save()
+    stats = crawl.stats()
+    print(f"Pages: {len(graph)}")
+    print(f"Links: {len(graph.targets)}")
+    print(f"Scanned {stats['scanned']} pages, reused {stats['reused']} from the index")
+    print(f"Read {stats['bytes']} bytes in {stats['seconds']:.2f}s")
+    print(f"  {stats['pages_per_second']:.0f} pages/sec")
+    print(f"  {stats['bytes_per_second']:.0f} bytes/sec")
+
+
+class Crawl():
+    """
+    Iterable of (page, links) for every HTML page in `directory`, where
+    links is the set of pages it links to, other than itself.
+
+    Files are read on a pool of `threads` threads, a chunk of
+    `chunk_size` bytes at a time, and pages are yielded as soon as they
+    are scanned. Counts of pages, links and bytes read, and the time
+    taken, are kept as it goes.
+
+    `known` maps pages to their (size, mtime_ns, links) from an earlier
+    crawl, as loaded by `load_index`. Pages whose size and modification
+    time have not changed since are not scanned again. After a crawl,
+    `files` holds the same for every page found, for `save` to write.
+    """
+
+    def __init__(self, directory, threads=None, chunk_size=CHUNK_SIZE, known=None):
+        self.directory = directory
+        self.threads = threads
+        self.chunk_size = chunk_size
+        self.known = {} if known is None else known
+        self.files = {}
+        self.pages = 0
+        self.links = 0
+        self.bytes = 0
+        self.scanned = 0
+        self.seconds = 0.0
+
+    def __iter__(self):
+        start = time.perf_counter()
+        self.files = {}
+        with os.scandir(self.directory) as entries:
+            found = [
+                (entry.path, entry.stat()) for entry in entries
+                if entry.name.endswith(".html") and entry.is_file()
+            ]
+
+        # Pages that have not changed keep the links they had
+        stale = []
+        for path, stat in found:
+            page = os.path.basename(path)
+            record = self.known.get(page)
+            if record is None or record[:2] != (stat.st_size, stat.st_mtime_ns):
+                stale.append((path, stat))
+                continue
+            self.files[page] = record
+            yield self.record(page, set(record[2]), 0, start)
+
+        tasks = [stale[i:i + FILES_PER_TASK] for i in range(0, len(stale), FILES_PER_TASK)]
+        with concurrent.futures.ThreadPoolExecutor(self.threads) as executor:
+            for task, results in zip(tasks, executor.map(self.scan, tasks)):
+                for (path, stat), (links, size) in zip(task, results):
+                    page = os.path.basename(path)
+                    links.discard(page)
+                    self.scanned += 1
+
+                    # Keep the size and time from before the scan, so a file changed while
+                    # it was being read is scanned again next time
+                    self.files[page] = (stat.st_size, stat.st_mtime_ns, links)
+                    yield self.record(page, set(links), size, start)
+
+    def record(self, page, links, size, start):
+        self.pages += 1
+        self.links += len(links)
+        self.bytes += size
+        self.seconds = time.perf_counter() - start
+        return page, links
+
+    def scan(self, task):
+        return [scan_links(path, self.chunk_size) for path, stat in task]
+
+    def changed(self):
+        """
+        Returns True if any page was added, changed or deleted since the
+        known crawl.
+        """
+        return self.scanned > 0 or len(self.files) != len(self.known)
+
+    def save(self):
+        """
+        Writes the links found to the corpus's index, if they changed.
+        """
+        if not self.changed():
+            return
+        try:
+            save_index(index_path(self.directory), self.files)
+        except OSError:
+            pass
+
+    def stats(self):
+        """
+        Returns the counts so far, and pages and bytes read per second.
+        """
+        return {
+            "pages": self.pages,
+            "links": self.links,
+            "bytes": self.bytes,
+            "scanned": self.scanned,
+            "reused": self.pages - self.scanned,
+            "seconds": self.seconds,
+            "pages_per_second": self.pages / self.seconds if self.seconds else 0.0,
+            "bytes_per_second": self.bytes / self.seconds if self.seconds else 0.0
+        }
+
+
+def scan_links(path, chunk_size=CHUNK_SIZE):
+    """
+    Returns the set of links in an HTML file, and its size in bytes,
+    reading it a chunk at a time.
+    """
+    links = set()
+    size = 0
+    pending = b""
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            size += len(chunk)
+            text = pending + chunk
+            end = 0
+            for match in LINK.finditer(text):
+                links.add(match.group(1))
+                end = match.end()
+
+            # A tag cut off by the end of the chunk is scanned again with the next one,
+            # unless it is already longer than any link tag should be
+            cut = text.rfind(b"<", end)
+            pending = text[cut:] if cut >= 0 and len(text) - cut <= MAX_TAG else b""
+    return {link.decode("utf-8", "replace") for link in links}, size
+
+
+def crawl_graph(crawl):
+    """
+    Returns the LinkGraph of a Crawl, streaming each page's links into
+    it as the page is scanned.
+    """
+    builder = LinkGraphBuilder()
+    for page, links in crawl:
+        builder.add(page, links)
+    return builder.build()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+import argparse
+import mmap
+import os
+import tempfile
+import time
+from array import array
+
+from crawler import Crawl
+from linkgraph import top_pages
+from linkindex import index_path, load_index
+from pagerank import DAMPING
+from solvers import NORMS
+from storage import ALIGNMENT, atomic_write, read_header, write_header
+
+# Bump whenever the layout of an edge list changes
+EDGES_VERSION = 1
+
+MAGIC = b"PRED"
+
+# Links mapped into memory at a time while iterating
+BLOCK_EDGES = 1 << 20
+
+# Links held in memory at a time while writing
+BUFFER_EDGES = 1 << 20
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Crawl a corpus to an edge list on disk, then compute PageRank from it."
+    )
+    parser.add_argument("corpus", help="directory of HTML pages")
+    parser.add_argument("--edges", default=None,
+                        help="edge list to write (default: pagerank.edges in the corpus)")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="number of threads reading files (default: chosen by Python)")
+    parser.add_argument("--block-edges", type=int, default=BLOCK_EDGES,
+                        help="links mapped into memory at a time")
+    parser.add_argument("--tolerance", type=float, default=0.001,
+                        help="change below which the ranks have converged")
+    parser.add_argument("--norm", choices=sorted(NORMS), default="max",
+                        help="how the change in the ranks is measured")
+    parser.add_argument("--top", type=int, default=10, help="number of top pages to print")
+    args = parser.parse_args()
+
+    path = args.edges or edges_path(args.corpus)
+    start = time.perf_counter()
+    crawl = Crawl(args.corpus, args.threads, known=load_index(index_path(args.corpus)))
+    write_edge_list(crawl, path)
+    crawl.save()
+    print(f"Wrote {path} in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    edges = EdgeList(path)
+    trace = []
+    ranks = stream_pagerank(edges, DAMPING, args.tolerance, args.norm, args.block_edges, trace)
+    seconds = time.perf_counter() - start
+    print(f"{len(edges)} pages, {edges.links} links, {len(edges.dangling)} dangling")
+    print(f"PageRank Results from Streaming ({len(trace)} iterations, {seconds:.2f}s)")
+    for page, rank in top_pages(edges, ranks, args.top):
+        print(f"  {page}: {rank:.4f}")
+
+
+def edges_path(directory):
+    """
+    Returns where the edge list of a corpus is kept by default.
+    """
+    return os.path.join(directory, "pagerank.edges")
+
+
+def write_edge_list(crawl, path):
+    """
+    Writes the links of a Crawl to `path` as a binary edge list, and
+    returns the number of pages.
+
+    Pages are numbered by sorting their names, as in a LinkGraph, and
+    the pages linking to each page are stored in order of their number,
+    sorted by the page they link to. Links to pages outside the corpus
+    are dropped.
+
+    Only the names and a few numbers per page are held in memory. The
+    links are spilled to a temporary file as they are found, then
+    placed by counting sort straight into the mapped edge list.
+    """
+    names = {}
+    is_page = bytearray()
+
+    def number(name):
+        if name not in names:
+            names[name] = len(names)
+            is_page.append(0)
+        return names[name]
+
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.TemporaryFile(dir=directory) as spill:
+        # Spill (page, link) pairs by order of appearance, as the pages are scanned
+        pairs = array("i")
+        for page, links in crawl:
+            j = number(page)
+            is_page[j] = 1
+            for link in links:
+                pairs.append(j)
+                pairs.append(number(link))
+            if len(pairs) >= 2 * BUFFER_EDGES:
+                pairs.tofile(spill)
+                del pairs[:]
+        pairs.tofile(spill)
+        del pairs[:]
+
+        # Number the pages by name, and drop every other name
+        pages = sorted((name for name, i in names.items() if is_page[i]))
+        renumber = array("i", [-1]) * len(names)
+        for i, name in enumerate(pages):
+            renumber[names[name]] = i
+        names = None
+
+        n = len(pages)
+        offsets = array("q", [0]) * (n + 1)
+        out_degree = array("i", [0]) * n
+        for j, i in spilled(spill, renumber):
+            offsets[i + 1] += 1
+            out_degree[j] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+
+        name_offsets = array("q", [0])
+        blob = bytearray()
+        for name in pages:
+            blob += name.encode("utf-8", "surrogateescape")
+            name_offsets.append(len(blob))
+        pages = None
+
+        sections = [
+            ("name_offsets", name_offsets.tobytes()), ("names", bytes(blob)),
+            ("offsets", offsets.tobytes()), ("out_degree", out_degree.tobytes())
+        ]
+        layout = {}
+        position = 0
+        for name, data in sections:
+            layout[name] = [position, len(data)]
+            position = aligned(position + len(data))
+        layout["sources"] = [position, 4 * offsets[n]]
+        header = {"sections": layout, "pages": n, "links": offsets[n]}
+
+        with atomic_write(path, "w+b") as f:
+            start = write_header(f, MAGIC, EDGES_VERSION, header)
+            for name, data in sections:
+                f.seek(start + layout[name][0])
+                f.write(data)
+            f.truncate(start + position + 4 * offsets[n])
+
+            if offsets[n]:
+                with mmap.mmap(f.fileno(), 0) as mapped:
+                    sources = memoryview(mapped)[start + position:].cast("i")
+                    next_source = array("q", offsets)
+                    for j, i in spilled(spill, renumber):
+                        sources[next_source[i]] = j
+                        next_source[i] += 1
+
+                    # Pages were scanned in any order, so sort the links into each page
+                    for i in range(n):
+                        if offsets[i + 1] - offsets[i] > 1:
+                            block = sources[offsets[i]:offsets[i + 1]]
+                            block[:] = array("i", sorted(block))
+                    block = None
+                    sources.release()
+                    mapped.flush()
+    return n
+
+
+def spilled(spill, renumber):
+    """
+    Yields every (page, link) spilled to a file, by the numbers of the
+    pages, skipping links to pages outside the corpus.
+    """
+    spill.seek(0)
+    while chunk := spill.read(8 * BUFFER_EDGES):
+        pairs = array("i", chunk)
+        for k in range(0, len(pairs), 2):
+            j = renumber[pairs[k]]
+            i = renumber[pairs[k + 1]]
+            if i >= 0:
+                yield j, i
+
+
+def aligned(position):
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+class EdgeList():
+    """
+    Link matrix of a corpus kept on disk, as written by `write_edge_list`.
+
+    Like a LinkGraph, page `i` is `pages[i]`, it has `out_degree[i]`
+    links, and the pages that link to it are the links numbered
+    `offsets[i]` to `offsets[i + 1]`. Only those per-page arrays are
+    read into memory: the links themselves are read by `blocks`.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            found = read_header(f, MAGIC, EDGES_VERSION)
+            if found is None:
+                raise ValueError(f"not an edge list of version {EDGES_VERSION}: {path}")
+            header, self.start = found
+            self.layout = header["sections"]
+            self.links = header["links"]
+
+            def section(name, typecode=None):
+                offset, size = self.layout[name]
+                f.seek(self.start + offset)
+                chunk = f.read(size)
+                return array(typecode, chunk) if typecode else chunk
+
+            name_offsets = section("name_offsets", "q")
+            blob = section("names")
+            self.pages = [
+                blob[name_offsets[i]:name_offsets[i + 1]].decode("utf-8", "surrogateescape")
+                for i in range(len(name_offsets) - 1)
+            ]
+            self.offsets = section("offsets", "q")
+            self.out_degree = section("out_degree", "i")
+        self.dangling = array("i", (j for j, degree in enumerate(self.out_degree) if degree == 0))
+
+    def __len__(self):
+        return len(self.pages)
+
+    def blocks(self, block_edges=BLOCK_EDGES):
+        """
+        Yields (first, last, sources) for runs of pages whose links in
+        together fit in about `block_edges`, where the pages linking to
+        page `i`, for `first <= i < last`, are
+        `sources[offsets[i] - offsets[first]:offsets[i + 1] - offsets[first]]`.
+
+        Each run is mapped into memory only until the next is asked for.
+        """
+        n = len(self)
+        offsets = self.offsets
+        base = self.start + self.layout["sources"][0]
+        with open(self.path, "rb") as f:
+            first = 0
+            while first < n:
+                # Take at least one page, however many links it has
+                last = first + 1
+                while last < n and offsets[last + 1] - offsets[first] <= block_edges:
+                    last += 1
+
+                size = 4 * (offsets[last] - offsets[first])
+                if size == 0:
+                    yield first, last, ()
+                    first = last
+                    continue
+
+                # Mappings must start on a boundary, so map from the one before the block
+                position = base + 4 * offsets[first]
+                skip = position % mmap.ALLOCATIONGRANULARITY
+                with mmap.mmap(f.fileno(), skip + size, offset=position - skip,
+                               access=mmap.ACCESS_READ) as mapped:
+                    view = memoryview(mapped)[skip:].cast("i")
+                    try:
+                        yield first, last, view
+                    finally:
+                        view.release()
+                first = last
+
+    def ranks(self, values):
+        """
+        Returns a dictionary mapping each page to its value in `values`.
+        """
+        return dict(zip(self.pages, values))
+
+
+def stream_step(edges, damping_factor, ranks, block_edges=BLOCK_EDGES):
+    """
+    Returns the ranks after one step of power iteration from `ranks`,
+    reading the links of an EdgeList a block at a time.
+
+    The ranks are computed exactly as `solvers.jacobi_step` does, so
+    they match those of a LinkGraph of the same corpus.
+    """
+    n = len(edges)
+    offsets = edges.offsets
+    shares = [
+        rank / degree if degree else 0.0
+        for rank, degree in zip(ranks, edges.out_degree)
+    ]
+    dangling = sum(ranks[j] for j in edges.dangling)
+    base = (1 - damping_factor) / n + damping_factor * dangling / n
+
+    new_ranks = []
+    for first, last, sources in edges.blocks(block_edges):
+        start = offsets[first]
+        new_ranks.extend(
+            base + damping_factor * sum(map(shares.__getitem__, sources[offsets[i] - start:offsets[i + 1] - start]))
+            for i in range(first, last)
+        )
+    return new_ranks
+
+
+def stream_pagerank(edges, damping_factor, tolerance=0.001, norm="max", block_edges=BLOCK_EDGES,
+                    trace=None, max_iterations=None):
+    """
+    Returns the PageRank of every page of an EdgeList, as a list, by
+    power iteration from the uniform distribution, streaming the links
+    from disk every iteration. Stops as `solvers.solve` does for the
+    "jacobi" method, so the ranks equal those of `iterate_pagerank`.
+    """
+    if norm not in NORMS:
+        raise ValueError(f"unknown norm: {norm}")
+    n = len(edges)
+    ranks = [1 / n] * n
+    iterations = 0
+    while True:
+        new_ranks = stream_step(edges, damping_factor, ranks, block_edges)
+        residual = NORMS[norm]([new - old for new, old in zip(new_ranks, ranks)])
+        ranks = new_ranks
+        iterations += 1
+        if trace is not None:
+            trace.append({"residual": residual, "updated": n})
+        if residual < tolerance:
+            return ranks
+        if max_iterations is not None and iterations >= max_iterations:
+            return ranks
+
+
+if __name__ == "__main__":
+    main()
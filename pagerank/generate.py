@@ -0,0 +1,98 @@
+import argparse
+import html
+import itertools
+import os
+import random
+
+WORDS = [
+    "Algorithms", "Bayes", "Compilers", "Data", "Entropy", "Graphs", "Heuristics", "Inference",
+    "Logic", "Markov", "Networks", "Optimization", "Planning", "Probability", "Python",
+    "Recursion", "Search", "Sorting", "Theory", "Vision"
+]
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+    <head>
+        <title>{title}</title>
+    </head>
+    <body>
+        <h1>{title}</h1>
+
+        <div>Links:</div>
+        <ul>
+{links}
+        </ul>
+    </body>
+</html>
+"""
+
+LINK = """            <li><a href="{href}">{title}</a></li>"""
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic corpus of HTML pages for pagerank.py."
+    )
+    parser.add_argument("directory", help="directory to write the HTML pages to")
+    parser.add_argument("--pages", type=int, default=10000, help="number of pages")
+    parser.add_argument("--alpha", type=float, default=2.0,
+                        help="power-law exponent of out-degrees and of how often pages are linked to")
+    parser.add_argument("--max-links", type=int, default=100, help="most links out of a page")
+    parser.add_argument("--dangling", type=float, default=0.05,
+                        help="fraction of pages with no links")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    generate(args.directory, args.pages, args.alpha, args.max_links, args.dangling, args.seed)
+
+
+def generate(directory, pages, alpha=2.0, max_links=100, dangling=0.05, seed=0):
+    """
+    Writes `pages` HTML pages to `directory`, of which a `dangling`
+    fraction have no links.
+
+    Out-degrees of the other pages follow a power law with exponent
+    `alpha`, up to `max_links`, so most pages have a few links and a few
+    have very many. Links point to pages with power-law popularity too,
+    so a few pages are linked to from many.
+    """
+    if pages < 1:
+        raise ValueError("a corpus needs at least one page")
+    if alpha <= 1:
+        raise ValueError(f"power-law exponent must be above 1: {alpha}")
+    if not 0 <= dangling <= 1:
+        raise ValueError(f"dangling fraction must be between 0 and 1: {dangling}")
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    names = [f"page{i}.html" for i in range(pages)]
+    titles = [" ".join(rng.sample(WORDS, rng.randint(1, 3))) for i in range(pages)]
+    no_links = set(rng.sample(range(pages), round(dangling * pages)))
+
+    # Popularity of page i falls off as a power of its rank
+    cumulative = list(itertools.accumulate(
+        (rank + 1) ** -(1 / alpha) for rank in range(pages)
+    ))
+    ranking = list(range(pages))
+    rng.shuffle(ranking)
+
+    for page in range(pages):
+        links = set()
+        if page not in no_links and pages > 1:
+            degree = min(int(rng.paretovariate(alpha - 1)), max_links, pages - 1)
+
+            # Popular pages are drawn repeatedly, so keep drawing until there are enough
+            while len(links) < degree:
+                links.update(rng.choices(ranking, cum_weights=cumulative, k=degree - len(links)))
+                links.discard(page)
+
+        items = "\n".join(
+            LINK.format(href=names[link], title=html.escape(titles[link]))
+            for link in sorted(links)
+        )
+        with open(os.path.join(directory, names[page]), "w", encoding="utf-8") as f:
+            f.write(PAGE.format(title=html.escape(titles[page]), links=items))
+
+
+if __name__ == "__main__":
+    main()
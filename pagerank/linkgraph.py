@@ -0,0 +1,315 @@
+import heapq
+import random
+from array import array
+from bisect import bisect_left
+from collections import deque
+
+from solvers import NORMS, solve
+
+
+class LinkGraph():
+    """
+    Sparse link matrix of a corpus.
+
+    Pages are numbered by sorting their names, so page `i` is `pages[i]`.
+    The pages that link to page `i` are
+    `sources[offsets[i]:offsets[i + 1]]`, and the pages that page `j`
+    links to are `targets[out_offsets[j]:out_offsets[j + 1]]`, of which
+    there are `out_degree[j]`.
+
+    Pages with no links are `dangling`. They are treated as linking to
+    every page, but those links are never stored: their rank is spread
+    evenly over all pages as a single total each iteration.
+    """
+
+    def __init__(self, pages, offsets, sources, out_offsets, targets):
+        self.pages = pages
+        self.offsets = offsets
+        self.sources = sources
+        self.out_offsets = out_offsets
+        self.targets = targets
+        self.out_degree = array("i", (
+            out_offsets[j + 1] - out_offsets[j] for j in range(len(pages))
+        ))
+        self.dangling = array("i", (j for j, degree in enumerate(self.out_degree) if degree == 0))
+
+    def __len__(self):
+        return len(self.pages)
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """
+        Builds the link matrix of a corpus, as returned by `crawl`.
+        Links to pages outside the corpus are ignored.
+        """
+        builder = LinkGraphBuilder()
+        for page, links in corpus.items():
+            builder.add(page, links)
+        return builder.build()
+
+    @classmethod
+    def from_out_links(cls, pages, out_offsets, targets):
+        """
+        Builds the link matrix from the links out of each page, where
+        page `j` links to `targets[out_offsets[j]:out_offsets[j + 1]]`.
+        """
+        # Count the links into each page, then place each link by counting sort
+        offsets = array("i", [0]) * (len(pages) + 1)
+        for i in targets:
+            offsets[i + 1] += 1
+        for i in range(len(pages)):
+            offsets[i + 1] += offsets[i]
+
+        position = array("i", offsets)
+        sources = array("i", [0]) * len(targets)
+        for j in range(len(pages)):
+            for i in targets[out_offsets[j]:out_offsets[j + 1]]:
+                sources[position[i]] = j
+                position[i] += 1
+        return cls(pages, offsets, sources, out_offsets, targets)
+
+    def index(self, page):
+        """
+        Returns the number of a page, or None if it is not in the corpus.
+        """
+        i = bisect_left(self.pages, page)
+        if i < len(self.pages) and self.pages[i] == page:
+            return i
+        return None
+
+    def teleport(self, seed):
+        """
+        Returns the teleport of a seed, mapping page numbers to the
+        probability of jumping to them. A seed is either a collection of
+        pages, jumped to equally, or a dictionary of pages and weights.
+        Raises ValueError if no seed page with weight is in the corpus.
+        """
+        weights = seed if isinstance(seed, dict) else dict.fromkeys(seed, 1)
+        teleport = {}
+        for page, weight in weights.items():
+            i = self.index(page)
+            if i is not None and weight > 0:
+                teleport[i] = teleport.get(i, 0) + weight
+        total = sum(teleport.values())
+        if total == 0:
+            raise ValueError(f"no seed page is in the corpus: {sorted(weights)}")
+        return {i: weight / total for i, weight in teleport.items()}
+
+    def ranks(self, values):
+        """
+        Returns a dictionary mapping each page to its value in `values`.
+        """
+        return dict(zip(self.pages, values))
+
+
+class LinkGraphBuilder():
+    """
+    Builds a LinkGraph from pages and their links as they arrive, in
+    any order, without keeping them all as strings.
+
+    Names are numbered as they are first seen, whether as a page or a
+    link, and renumbered by sorting the pages when the graph is built.
+    Links to names that were never added as pages are then dropped.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.index = {}
+        self.added = array("i")
+        self.degrees = array("i")
+        self.targets = array("i")
+
+    def number(self, name):
+        i = self.index.get(name)
+        if i is None:
+            i = self.index[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+    def add(self, page, links):
+        """
+        Adds a page and the names of the pages it links to.
+        """
+        self.added.append(self.number(page))
+        before = len(self.targets)
+        self.targets.extend(self.number(link) for link in links)
+        self.degrees.append(len(self.targets) - before)
+
+    def build(self):
+        pages = sorted(self.names[i] for i in self.added)
+
+        # Where each name ends up, or -1 if it is not a page
+        order = array("i", [-1]) * len(self.names)
+        for i, page in enumerate(pages):
+            order[self.index[page]] = i
+
+        # Where each page's links were added
+        starts = array("i", [0]) * len(pages)
+        degrees = array("i", [0]) * len(pages)
+        start = 0
+        for name, degree in zip(self.added, self.degrees):
+            starts[order[name]] = start
+            degrees[order[name]] = degree
+            start += degree
+
+        out_offsets = array("i", [0])
+        targets = array("i")
+        for start, degree in zip(starts, degrees):
+            # Sorted, so the order of a page's links depends only on the corpus
+            targets.extend(sorted(i for i in map(order.__getitem__, self.targets[start:start + degree]) if i >= 0))
+            out_offsets.append(len(targets))
+        return LinkGraph.from_out_links(pages, out_offsets, targets)
+
+
+def power_iteration(graph, damping_factor, tolerance=0.001, ranks=None, norm="max"):
+    """
+    Returns the PageRank of every page of a LinkGraph, as a list,
+    by power iteration from the uniform distribution, or from `ranks`
+    if given, until the ranks change by less than `tolerance` in one
+    step, as measured by `norm`.
+    """
+    return solve(graph, damping_factor, "jacobi", tolerance, norm, ranks)
+
+
+def local_iteration(graph, damping_factor, ranks, region, tolerance=0.001, max_updates=None):
+    """
+    Updates `ranks`, a list of PageRank values for a LinkGraph, in place
+    around the pages in `region`, and returns how many updates it made.
+
+    Each queued page is recomputed from its incoming links, and the
+    pages it links to are queued in turn whenever it changes by
+    `tolerance` or more, until none are left or `max_updates` have been
+    made. Random jumps and the rank
+    of dangling pages are spread as they were before the first update,
+    so the result is only close to converged, for `power_iteration` to
+    finish from.
+    """
+    n = len(graph)
+    offsets = graph.offsets
+    sources = graph.sources
+    out_offsets = graph.out_offsets
+    out_degree = graph.out_degree
+    targets = graph.targets
+    dangling = sum(ranks[j] for j in graph.dangling)
+    base = (1 - damping_factor) / n + damping_factor * dangling / n
+
+    queue = deque(region)
+    queued = set(queue)
+    updates = 0
+    while queue and (max_updates is None or updates < max_updates):
+        i = queue.popleft()
+        queued.discard(i)
+        rank = base + damping_factor * sum(
+            ranks[j] / out_degree[j] for j in sources[offsets[i]:offsets[i + 1]]
+        )
+        change = rank - ranks[i]
+        ranks[i] = rank
+        updates += 1
+        if abs(change) >= tolerance:
+            for t in targets[out_offsets[i]:out_offsets[i + 1]]:
+                if t not in queued:
+                    queued.add(t)
+                    queue.append(t)
+    return updates
+
+
+def personalized_iteration(graph, damping_factor, teleports, tolerance=0.001, norm="max"):
+    """
+    Returns the personalized PageRank of every page of a LinkGraph for
+    each of `teleports`, as a list of lists, where each teleport maps
+    pages to the probability of jumping to them. Random jumps, and
+    steps from dangling pages, land according to the teleport instead
+    of uniformly.
+
+    Each vector is its own power iteration, stopping once its change in
+    an iteration, as measured by `norm` ("max", "l1" or "l2"), falls
+    below `tolerance`. They share the link matrix, and the incoming
+    links of each page are sliced only once for all of them.
+    """
+    if norm not in NORMS:
+        raise ValueError(f"unknown norm: {norm}")
+    n = len(graph)
+    links = [graph.sources[graph.offsets[i]:graph.offsets[i + 1]] for i in range(n)]
+
+    # Start every vector from its own teleport
+    ranks = []
+    for teleport in teleports:
+        start = [0.0] * n
+        for i, weight in teleport.items():
+            start[i] = weight
+        ranks.append(start)
+
+    active = list(range(len(teleports)))
+    while active:
+        still_active = []
+        for b in active:
+            shares = [
+                rank / degree if degree else 0.0
+                for rank, degree in zip(ranks[b], graph.out_degree)
+            ]
+            new_ranks = [
+                damping_factor * sum(map(shares.__getitem__, incoming))
+                for incoming in links
+            ]
+
+            # Random jumps and dangling pages' rank go back to the teleport pages
+            dangling = sum(ranks[b][j] for j in graph.dangling)
+            jump = 1 - damping_factor + damping_factor * dangling
+            for i, weight in teleports[b].items():
+                new_ranks[i] += jump * weight
+
+            change = NORMS[norm]([new - old for new, old in zip(new_ranks, ranks[b])])
+            ranks[b] = new_ranks
+            if change >= tolerance:
+                still_active.append(b)
+        active = still_active
+    return ranks
+
+
+def top_pages(graph, values, k):
+    """
+    Returns the `k` pages with the highest `values`, as a list of
+    (page, value) pairs from highest to lowest.
+    """
+    best = heapq.nlargest(k, range(len(values)), key=values.__getitem__)
+    return [(graph.pages[i], values[i]) for i in best]
+
+
+def random_walk(graph, damping_factor, n, walkers=1, rng=random):
+    """
+    Returns how many times each page of a LinkGraph is visited, as a
+    list, by `walkers` random surfers taking `n` samples between them.
+
+    Each surfer starts at a random page and moves in lockstep with the
+    others. Every step costs O(1): a single random number either picks
+    one of the current page's links, or, with probability
+    `1 - damping_factor` or from a dangling page, a page at random.
+    Raises ValueError if there are no walkers.
+    """
+    if walkers < 1:
+        raise ValueError(f"need at least one walker: {walkers}")
+    size = len(graph)
+    out_offsets = graph.out_offsets
+    out_degree = graph.out_degree
+    targets = graph.targets
+    draw = rng.random
+    jump = rng.randrange
+
+    def step(page):
+        u = draw()
+        degree = out_degree[page]
+        if u < damping_factor and degree:
+            # Below the damping factor, u is spread evenly over the page's links
+            return targets[out_offsets[page] + min(int(u / damping_factor * degree), degree - 1)]
+        return jump(size)
+
+    counts = [0] * size
+    pages = [jump(size) for walker in range(min(walkers, n))]
+    remaining = n
+    while remaining > 0:
+        pages = pages[:remaining]
+        for page in pages:
+            counts[page] += 1
+        remaining -= len(pages)
+        pages = [step(page) for page in pages]
+    return counts
@@ -0,0 +1,101 @@
+import os
+from array import array
+
+from storage import atomic_write, read_header, write_header
+
+# Bump whenever the layout of an index changes
+INDEX_VERSION = 1
+
+MAGIC = b"PRLX"
+
+
+def index_path(directory):
+    """
+    Returns where the link index of a corpus is kept.
+    """
+    return os.path.join(directory, "pagerank.index")
+
+
+def save_index(path, files):
+    """
+    Writes the links of a corpus to `path`, where `files` maps the name
+    of each page to its (size, mtime_ns, links) when it was scanned.
+    """
+    names = {}
+
+    def number(name):
+        if name not in names:
+            names[name] = len(names)
+        return names[name]
+
+    pages = array("i")
+    sizes = array("q")
+    mtimes = array("q")
+    link_offsets = array("i", [0])
+    links = array("i")
+    for page, (size, mtime, targets) in files.items():
+        pages.append(number(page))
+        sizes.append(size)
+        mtimes.append(mtime)
+        links.extend(number(link) for link in targets)
+        link_offsets.append(len(links))
+
+    # Every name, whether of a page or a link, is stored once
+    name_offsets = array("q", [0])
+    blob = bytearray()
+    for name in names:
+        blob += name.encode("utf-8", "surrogateescape")
+        name_offsets.append(len(blob))
+
+    sections = [
+        ("pages", pages.tobytes()), ("sizes", sizes.tobytes()), ("mtimes", mtimes.tobytes()),
+        ("link_offsets", link_offsets.tobytes()), ("links", links.tobytes()),
+        ("name_offsets", name_offsets.tobytes()), ("names", bytes(blob))
+    ]
+    layout = {}
+    position = 0
+    for name, data in sections:
+        layout[name] = [position, len(data)]
+        position += len(data)
+    with atomic_write(path) as f:
+        write_header(f, MAGIC, INDEX_VERSION, {"sections": layout})
+        for name, data in sections:
+            f.write(data)
+
+
+def load_index(path):
+    """
+    Returns what `save_index` wrote to `path`, or an empty dictionary if
+    there is no index or it is not of the current version.
+    """
+    try:
+        with open(path, "rb") as f:
+            found = read_header(f, MAGIC, INDEX_VERSION)
+            data = f.read()
+    except OSError:
+        return {}
+    if found is None:
+        return {}
+    header = found[0]
+
+    def section(name, typecode=None):
+        offset, size = header["sections"][name]
+        chunk = data[offset:offset + size]
+        return array(typecode, chunk) if typecode else chunk
+
+    name_offsets = section("name_offsets", "q")
+    blob = section("names")
+    names = [
+        blob[name_offsets[i]:name_offsets[i + 1]].decode("utf-8", "surrogateescape")
+        for i in range(len(name_offsets) - 1)
+    ]
+
+    link_offsets = section("link_offsets", "i")
+    links = section("links", "i")
+    files = {}
+    for i, (page, size, mtime) in enumerate(zip(
+        section("pages", "i"), section("sizes", "q"), section("mtimes", "q")
+    )):
+        targets = links[link_offsets[i]:link_offsets[i + 1]]
+        files[names[page]] = (size, mtime, {names[link] for link in targets})
+    return files
@@ -0,0 +1,127 @@
+import argparse
+import math
+import multiprocessing
+import random
+import time
+
+from linkgraph import LinkGraph, random_walk
+from pagerank import DAMPING, SAMPLES, crawl
+
+# Link graph and damping factor of each worker process, set by `start_worker`
+worker_graph = None
+worker_damping = None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Estimate PageRank from independent random walks run in parallel."
+    )
+    parser.add_argument("corpus", help="directory of HTML pages")
+    parser.add_argument("--samples", type=int, default=SAMPLES, help="number of samples per round")
+    parser.add_argument("--chains", type=int, default=None,
+                        help="number of independent walks per round (default: two per process)")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="number of worker processes (default: one per core)")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    parser.add_argument("--target-error", type=float, default=None,
+                        help="keep sampling until no page's standard error is above this")
+    parser.add_argument("--max-samples", type=int, default=None,
+                        help="most samples to take when sampling to a target error")
+    args = parser.parse_args()
+
+    corpus = crawl(args.corpus)
+    start = time.perf_counter()
+    ranks, errors, samples = parallel_sample_pagerank(
+        corpus, DAMPING, args.samples, args.chains, args.processes, args.seed,
+        args.target_error, args.max_samples
+    )
+    seconds = time.perf_counter() - start
+
+    print(f"PageRank Results from Parallel Sampling (n = {samples}, {seconds:.2f}s)")
+    for page in sorted(ranks):
+        print(f"  {page}: {ranks[page]:.4f} ± {errors[page]:.4f}")
+    print(f"Largest standard error: {max(errors.values()):.4f}")
+
+
+def parallel_sample_pagerank(corpus, damping_factor, n, chains=None, processes=None, seed=None,
+                             target_error=None, max_samples=None):
+    """
+    Estimates PageRank from `chains` independent random walks, split
+    evenly between `n` samples and run on a pool of `processes` workers.
+
+    Returns a dictionary of the merged estimate for each page, a
+    dictionary of its standard error, judged from how much the chains'
+    own estimates disagree, and the number of samples taken.
+
+    If `target_error` is given, rounds of `n` more samples are taken
+    until no standard error is above it, or `max_samples` are taken.
+    """
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if chains is None:
+        chains = 2 * processes
+    chains = max(2, min(chains, n))
+    if max_samples is None:
+        max_samples = 100 * n
+
+    graph = LinkGraph.from_corpus(corpus)
+    rng = random.Random(seed)
+    counts = []
+    samples = 0
+    with multiprocessing.Pool(
+        processes, initializer=start_worker, initargs=(graph, damping_factor)
+    ) as pool:
+        while True:
+            # Every chain gets its own seed, drawn from the one given
+            tasks = [
+                (n // chains + (chain < n % chains), rng.randrange(2 ** 63))
+                for chain in range(chains)
+            ]
+            counts.extend(pool.map(walk_chain, tasks))
+            samples += n
+
+            ranks, errors = merge_counts(counts, samples)
+            if target_error is None or max(errors) <= target_error or samples + n > max_samples:
+                return graph.ranks(ranks), graph.ranks(errors), samples
+
+
+def start_worker(graph, damping_factor):
+    """
+    Keeps the link graph to walk in a worker process.
+    """
+    global worker_graph, worker_damping
+    worker_graph = graph
+    worker_damping = damping_factor
+
+
+def walk_chain(task):
+    """
+    Returns the visit counts of one random walk of `samples` steps,
+    where `task` is (samples, seed).
+    """
+    samples, seed = task
+    return samples, random_walk(worker_graph, worker_damping, samples, rng=random.Random(seed))
+
+
+def merge_counts(counts, samples):
+    """
+    Merges (samples, visit counts) from independent chains into an
+    estimate of each page's rank and its standard error.
+
+    The error is the spread of the chains' own estimates around the
+    merged one, weighting each chain by its number of samples.
+    """
+    ranks = [sum(visits) / samples for visits in zip(*(chain for size, chain in counts))]
+    if len(counts) < 2:
+        return ranks, [math.inf] * len(ranks)
+
+    errors = []
+    for i, rank in enumerate(ranks):
+        spread = sum(size * (chain[i] / size - rank) ** 2 for size, chain in counts if size)
+        variance = spread / samples / (len(counts) - 1)
+        errors.append(math.sqrt(variance))
+    return ranks, errors
+
+
+if __name__ == "__main__":
+    main()
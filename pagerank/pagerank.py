@@ -1,8 +1,12 @@
-import os
-import random
-import re
 import sys
 
+from crawler import Crawl
+from linkgraph import (
+    LinkGraph, local_iteration, personalized_iteration, power_iteration, random_walk, top_pages
+)
+from linkindex import index_path, load_index
+from solvers import page_tolerance, solve
+
 DAMPING = 0.85
 SAMPLES = 10000
 
@@ -27,16 +31,10 @@ def crawl(directory):
     Return a dictionary where each key is a page, and values are
     a list of all other pages in the corpus that are linked to by the page.
     """
-    pages = dict()
-
-    # Extract all links from HTML files
-    for filename in os.listdir(directory):
-        if not filename.endswith(".html"):
-            continue
-        with open(os.path.join(directory, filename)) as f:
-            contents = f.read()
-            links = re.findall(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", contents)
-            pages[filename] = set(links) - {filename}
+    # Extract all links from HTML files, reading only those changed since the last crawl
+    crawl = Crawl(directory, known=load_index(index_path(directory)))
+    pages = dict(crawl)
+    crawl.save()
 
     # Only include links to other pages in the corpus
     for filename in pages:
@@ -57,28 +55,26 @@ def transition_model(corpus, page, damping_factor):
     linked to by `page`. With probability `1 - damping_factor`, choose
     a link at random chosen from all pages in the corpus.
     """
-    # If the page has no links, then have it link to all pages in the corpus   
-    num_links = len(corpus[page])
-    if num_links == 0:
-        num_links = len(corpus)
-   
     num_pages = len(corpus)
     proba_page = (1 - damping_factor) / num_pages # Probability of choosing a page at random
-    keys = list(corpus.keys())
-    distribution = dict.fromkeys(keys, proba_page) # Initialize distribution with equal probability for all pages
-    proba_link = 1 / num_links # Probability of choosing a link at random from the current page
-   
-    # Iterate through all pages and check if a page is linked to by the current page
-    for key in keys:
-        if key in corpus[page]:
-            distribution[key] += damping_factor * proba_link
-    
-    return distribution
 
-    raise NotImplementedError
+    # If the page has no links, then it links to all pages in the corpus, which
+    # only adds the same probability to every page rather than needing a set of them
+    if len(corpus[page]) == 0:
+        return dict.fromkeys(corpus, proba_page + damping_factor / num_pages)
+
+    distribution = dict.fromkeys(corpus, proba_page) # Initialize distribution with equal probability for all pages
+    proba_link = 1 / len(corpus[page]) # Probability of choosing a link at random from the current page
+
+    # Add the probability of following each link, visiting only the page's own links
+    for link in corpus[page]:
+        if link in distribution:
+            distribution[link] += damping_factor * proba_link
+
+    return distribution
 
 
-def sample_pagerank(corpus, damping_factor, n):
+def sample_pagerank(corpus, damping_factor, n, walkers=1):
     """
     Return PageRank values for each page by sampling `n` pages
     according to transition model, starting with a page at random.
@@ -86,27 +82,17 @@ def sample_pagerank(corpus, damping_factor, n):
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
+
+    With more than one walker, that many surfers take the `n` samples
+    between them, each starting at a page at random.
     """
-    page_ranks = dict.fromkeys(corpus.keys(), 0) # Initialize page ranks to 0
-    
-    # Initialize the distribution with equal probability for all pages
-    for i in range(n):
-        # Chooses a random page to start the sampling (if i == 0 then it simply chooses a random page, else it chooses a page based on the previous distribution)
-        if i == 0:
-            random_page = random.choice(list(corpus.keys()))
-        else:
-            random_page = random.choices(list(corpus.keys()), weights=list(distribution.values()), k=1)[0]
-            
-        page_ranks[random_page] += 1 # Increment the page rank for the chosen page
-        distribution = transition_model(corpus, random_page, damping_factor) # Get the transition model for the chosen page for the next sample
-
-    page_ranks = {page: rank / n for page, rank in page_ranks.items()} # Normalize the page ranks by dividing the number of occurences by the number of samples
-    return page_ranks
-    
-    raise NotImplementedError
-
-
-def iterate_pagerank(corpus, damping_factor):
+    # Sample from the link matrix, where each step takes constant time
+    graph = LinkGraph.from_corpus(corpus)
+    counts = random_walk(graph, damping_factor, n, walkers)
+    return graph.ranks(count / n for count in counts)
+
+
+def iterate_pagerank(corpus, damping_factor, method="jacobi", tolerance=0.001, norm="max", trace=None):
     """
     Return PageRank values for each page by iteratively updating
     PageRank values until convergence.
@@ -114,46 +100,90 @@ def iterate_pagerank(corpus, damping_factor):
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
+
+    The `method`, and the `tolerance` and `norm` that decide when the
+    values have converged, are those of `solvers.solve`. If `trace` is
+    a list, how much the values changed in each iteration is added to it.
     """
-    proba = 1 / len(corpus)
-    distribution = dict.fromkeys(corpus.keys(), proba) # Initialize distribution with equal probability for all pages
-    proba_page = (1 - damping_factor) / len(corpus) # Probability of choosing a page at random
-    
-    # Iterate until convergence (i.e. the difference between the old and new distribution is less than 0.001)
-    converged = False
-    while not converged:
-        old_distribution = distribution.copy()
-
-        # Update the distribution for each page based on the links from other pages
-        for page in sorted(corpus.keys()):
-            page_ranks = 0
-            
-            # Goes through each link and checks if the page is linked to by that link
-            for link in corpus.keys():
-                links = list(corpus[link])
-                
-                # If the link has no links, then it links to all pages in the corpus
-                if len(links) == 0:
-                    links = list(corpus.keys())
-                    corpus[link] = set(links)
-                
-                # If the page is linked to by the link, then add the probability of the link to the page ranks (sum of the probabilities of all links that link to the page)
-                if page in corpus[link]:
-                    page_ranks += (distribution[link] / len(links))
-            
-            distribution[page] = proba_page + (damping_factor * page_ranks) # Update the distribution for the page based on the sum of the probabilities of all links that link to the page       
-        
-        # Check for convergence by comparing the old and new distribution
-        max_diff = 0
-        for page in old_distribution:
-            diff = abs(old_distribution[page] - distribution[page])
-            if diff > max_diff:
-                max_diff = diff 
-        if max_diff < 0.001:
-            converged = True
+    # Build the sparse link matrix once, then iterate over it
+    graph = LinkGraph.from_corpus(corpus)
+    return graph.ranks(solve(graph, damping_factor, method, tolerance, norm, trace=trace))
 
-    return distribution
-    raise NotImplementedError
+
+def diff_corpus(old, new):
+    """
+    Return the changes from one corpus to another, as a dictionary of
+    the pages "added" and "removed", and the (page, link) pairs
+    "linked" and "unlinked", counting a removed page's links as
+    unlinked and an added page's links as linked.
+    """
+    diff = {"added": set(), "removed": set(), "linked": set(), "unlinked": set()}
+    for page in old.keys() | new.keys():
+        if page not in old:
+            diff["added"].add(page)
+        elif page not in new:
+            diff["removed"].add(page)
+        before = old.get(page, set())
+        after = new.get(page, set())
+        diff["linked"].update((page, link) for link in after - before)
+        diff["unlinked"].update((page, link) for link in before - after)
+    return diff
+
+
+def update_pagerank(corpus, damping_factor, ranks, diff, tolerance=0.001, norm="max"):
+    """
+    Return PageRank values for each page of `corpus`, given the `ranks`
+    of the pages before the changes in `diff`, as returned by
+    `diff_corpus`, were made to it.
+
+    Starts from the old ranks, and first updates only the pages whose
+    incoming links changed, and any pages those changes spread to,
+    before iterating over the whole corpus until convergence. The
+    `tolerance` and `norm` that decide when the values have converged
+    are those of `solvers.solve`.
+    """
+    graph = LinkGraph.from_corpus(corpus)
+
+    # Warm start from the old ranks, with new pages at the average
+    start = [ranks.get(page, 1 / len(graph)) for page in graph.pages]
+    total = sum(start)
+    start = [rank / total for rank in start]
+
+    # Pages whose incoming links changed, including every link of a page whose degree changed
+    region = {graph.index(page) for page in diff["added"]}
+    for page, link in diff["linked"] | diff["unlinked"]:
+        region.add(graph.index(link))
+        j = graph.index(page)
+        if j is not None:
+            region.update(graph.targets[graph.out_offsets[j]:graph.out_offsets[j + 1]])
+    region.discard(None)
+
+    # A change spreads while it is large enough to matter to the whole corpus converging,
+    # for at most as many updates as one sweep over the corpus would make
+    threshold = page_tolerance(tolerance, norm, len(graph))
+    local_iteration(graph, damping_factor, start, sorted(region), threshold, len(graph))
+    total = sum(start)
+    start = [rank / total for rank in start]
+    return graph.ranks(power_iteration(graph, damping_factor, tolerance, start, norm))
+
+
+def personalized_pagerank(corpus, damping_factor, seeds, k=10, tolerance=0.001, norm="max"):
+    """
+    Return the `k` highest personalized PageRank values for each of a
+    batch of `seeds`, where the random surfer only ever jumps to the
+    seed's pages. A seed is either a collection of pages, jumped to
+    equally, or a dictionary of pages and their weights.
+
+    Return a list with, for each seed, a list of (page, rank) pairs
+    from the highest rank to the lowest. The `tolerance` and `norm`
+    that decide when the values have converged are those of
+    `solvers.solve`.
+    """
+    # Solve every seed against the same link matrix
+    graph = LinkGraph.from_corpus(corpus)
+    teleports = [graph.teleport(seed) for seed in seeds]
+    ranks = personalized_iteration(graph, damping_factor, teleports, tolerance, norm)
+    return [top_pages(graph, values, k) for values in ranks]
 
 
 if __name__ == "__main__":
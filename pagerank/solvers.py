@@ -0,0 +1,284 @@
+import math
+
+# Distances between successive rank vectors, as functions of their differences
+NORMS = {
+    "max": lambda changes: max(map(abs, changes), default=0.0),
+    "l1": lambda changes: sum(map(abs, changes)),
+    "l2": lambda changes: math.sqrt(sum(change * change for change in changes))
+}
+
+# How often, in iterations, the extrapolating solvers extrapolate
+EXTRAPOLATION_PERIOD = 10
+
+# How often, in iterations, the adaptive solver recomputes frozen ranks
+REFRESH_PERIOD = 10
+
+
+def solve(graph, damping_factor, method="jacobi", tolerance=0.001, norm="max",
+          ranks=None, trace=None, max_iterations=None):
+    """
+    Returns the PageRank of every page of a LinkGraph, as a list,
+    iterating from the uniform distribution, or from `ranks` if given,
+    until an iteration that updates every rank changes them by less
+    than `tolerance`, as measured by `norm` ("max", "l1" or "l2"), or
+    `max_iterations` pass.
+
+    `method` is one of:
+        "jacobi": power iteration, computing every rank from the last
+            iteration's ranks
+        "gauss-seidel": computes each rank from the latest ranks,
+            including those already updated in the same iteration
+        "aitken": power iteration, with every rank extrapolated from its
+            last three values by Aitken's delta-squared process every
+            few iterations
+        "quadratic": power iteration, with the ranks extrapolated from
+            the last four iterations by quadratic extrapolation every
+            few iterations
+        "adaptive": power iteration that stops recomputing the ranks
+            that have converged
+
+    If `trace` is a list, a dictionary is appended to it for every
+    iteration, with the "residual" (the change in the ranks) and the
+    number of ranks "updated".
+    """
+    if norm not in NORMS:
+        raise ValueError(f"unknown norm: {norm}")
+    steps = {
+        "jacobi": jacobi_steps,
+        "gauss-seidel": gauss_seidel_steps,
+        "aitken": aitken_steps,
+        "quadratic": quadratic_steps,
+        "adaptive": adaptive_steps
+    }
+    if method not in steps:
+        raise ValueError(f"unknown method: {method}")
+
+    n = len(graph)
+    ranks = [1 / n] * n if ranks is None else list(ranks)
+    iterations = 0
+    for ranks, changes, updated in steps[method](graph, damping_factor, ranks, tolerance, norm):
+        residual = NORMS[norm](changes)
+        iterations += 1
+        if trace is not None:
+            trace.append({"residual": residual, "updated": updated})
+        if residual < tolerance and updated == n:
+            return ranks
+        if max_iterations is not None and iterations >= max_iterations:
+            return ranks
+
+
+def jacobi_step(graph, damping_factor, ranks):
+    """
+    Returns the ranks after one step of power iteration from `ranks`.
+    """
+    n = len(graph)
+    offsets = graph.offsets
+    sources = graph.sources
+
+    # Each page passes an equal share of its rank along each of its links
+    shares = [
+        rank / degree if degree else 0.0
+        for rank, degree in zip(ranks, graph.out_degree)
+    ]
+
+    # Dangling pages and random jumps reach every page equally
+    dangling = sum(ranks[j] for j in graph.dangling)
+    base = (1 - damping_factor) / n + damping_factor * dangling / n
+
+    return [
+        base + damping_factor * sum(map(shares.__getitem__, sources[offsets[i]:offsets[i + 1]]))
+        for i in range(n)
+    ]
+
+
+def jacobi_steps(graph, damping_factor, ranks, tolerance, norm):
+    """
+    Yields (ranks, changes, updated) after each step of power iteration.
+    """
+    while True:
+        new_ranks = jacobi_step(graph, damping_factor, ranks)
+        changes = [new - old for new, old in zip(new_ranks, ranks)]
+        ranks = new_ranks
+        yield ranks, changes, len(ranks)
+
+
+def gauss_seidel_steps(graph, damping_factor, ranks, tolerance, norm):
+    """
+    Yields (ranks, changes, updated) after each Gauss-Seidel sweep.
+    """
+    n = len(graph)
+    offsets = graph.offsets
+    sources = graph.sources
+    out_degree = graph.out_degree
+    ranks = list(ranks)
+    while True:
+        old_ranks = list(ranks)
+        shares = [
+            rank / degree if degree else 0.0
+            for rank, degree in zip(ranks, out_degree)
+        ]
+        dangling = sum(ranks[j] for j in graph.dangling)
+
+        # Every updated rank is passed on straight away, to the pages after it
+        for i in range(n):
+            rank = (1 - damping_factor) / n + damping_factor * (
+                dangling / n + sum(map(shares.__getitem__, sources[offsets[i]:offsets[i + 1]]))
+            )
+            if out_degree[i]:
+                shares[i] = rank / out_degree[i]
+            else:
+                dangling += rank - ranks[i]
+            ranks[i] = rank
+
+        # Sweeps do not keep the total at 1, so restore it
+        total = sum(ranks)
+        ranks = [rank / total for rank in ranks]
+        yield ranks, [new - old for new, old in zip(ranks, old_ranks)], n
+
+
+def aitken_steps(graph, damping_factor, ranks, tolerance, norm):
+    """
+    Yields (ranks, changes, updated) after each step of power iteration,
+    extrapolating each rank with Aitken's delta-squared process every
+    `EXTRAPOLATION_PERIOD` steps.
+    """
+    history = [ranks]
+    iteration = 0
+    while True:
+        new_ranks = jacobi_step(graph, damping_factor, ranks)
+        iteration += 1
+        history = history[-2:] + [new_ranks]
+        if iteration % EXTRAPOLATION_PERIOD == 0 and len(history) == 3:
+            new_ranks = normalize([aitken(x0, x1, x2) for x0, x1, x2 in zip(*history)])
+            history = [new_ranks]
+        changes = [new - old for new, old in zip(new_ranks, ranks)]
+        ranks = new_ranks
+        yield ranks, changes, len(ranks)
+
+
+def aitken(x0, x1, x2):
+    """
+    Returns the limit that three successive values are heading to, by
+    Aitken's delta-squared process, or the last value unless they are
+    converging steadily from one side.
+    """
+    step = x2 - x1
+    previous = x1 - x0
+    if previous == 0 or not 0 < step / previous < 1:
+        return x2
+    return x2 - step * step / (step - previous)
+
+
+def quadratic_steps(graph, damping_factor, ranks, tolerance, norm):
+    """
+    Yields (ranks, changes, updated) after each step of power iteration,
+    extrapolating from the last four iterations by quadratic
+    extrapolation every `EXTRAPOLATION_PERIOD` steps.
+    """
+    history = [ranks]
+    iteration = 0
+    while True:
+        new_ranks = jacobi_step(graph, damping_factor, ranks)
+        iteration += 1
+        history = history[-3:] + [new_ranks]
+        if iteration % EXTRAPOLATION_PERIOD == 0 and len(history) == 4:
+            new_ranks = quadratic_extrapolation(*history)
+            history = [new_ranks]
+        changes = [new - old for new, old in zip(new_ranks, ranks)]
+        ranks = new_ranks
+        yield ranks, changes, len(ranks)
+
+
+def quadratic_extrapolation(x0, x1, x2, x3):
+    """
+    Returns the ranks that four successive iterations are heading to,
+    assuming the error is spanned by the two slowest eigenvectors.
+    """
+    y1 = [b - a for a, b in zip(x0, x1)]
+    y2 = [b - a for a, b in zip(x0, x2)]
+    y3 = [b - a for a, b in zip(x0, x3)]
+
+    # Least squares fit of y1 * g1 + y2 * g2 = -y3, by the normal equations
+    a11 = sum(a * a for a in y1)
+    a12 = sum(a * b for a, b in zip(y1, y2))
+    a22 = sum(b * b for b in y2)
+    b1 = -sum(a * c for a, c in zip(y1, y3))
+    b2 = -sum(b * c for b, c in zip(y2, y3))
+    determinant = a11 * a22 - a12 * a12
+    if abs(determinant) < 1e-300:
+        return x3
+    g1 = (b1 * a22 - b2 * a12) / determinant
+    g2 = (a11 * b2 - a12 * b1) / determinant
+    g3 = 1.0
+
+    beta0 = g1 + g2 + g3
+    beta1 = g2 + g3
+    beta2 = g3
+    return normalize([
+        beta0 * a + beta1 * b + beta2 * c
+        for a, b, c in zip(x1, x2, x3)
+    ])
+
+
+def adaptive_steps(graph, damping_factor, ranks, tolerance, norm):
+    """
+    Yields (ranks, changes, updated) after each step of power iteration,
+    where ranks that changed by less than their share of `tolerance`
+    are frozen and not recomputed. Every rank is recomputed again once
+    all are frozen, or every `REFRESH_PERIOD` steps, so that ranks
+    frozen too early catch up.
+    """
+    n = len(graph)
+    offsets = graph.offsets
+    sources = graph.sources
+
+    # Small enough that the ranks have converged once every one is frozen
+    threshold = page_tolerance(tolerance, norm, n)
+    active = range(n)
+    iteration = 0
+    while True:
+        shares = [
+            rank / degree if degree else 0.0
+            for rank, degree in zip(ranks, graph.out_degree)
+        ]
+        dangling = sum(ranks[j] for j in graph.dangling)
+        base = (1 - damping_factor) / n + damping_factor * dangling / n
+
+        new_ranks = list(ranks)
+        changes = []
+        still_active = []
+        for i in active:
+            rank = base + damping_factor * sum(map(shares.__getitem__, sources[offsets[i]:offsets[i + 1]]))
+            new_ranks[i] = rank
+            changes.append(rank - ranks[i])
+            if abs(rank - ranks[i]) >= threshold:
+                still_active.append(i)
+
+        # Frozen ranks do not move with the rest, so restore the total when all have moved
+        if len(active) == n:
+            new_ranks = normalize(new_ranks)
+        ranks = new_ranks
+        yield ranks, changes, len(active)
+
+        iteration += 1
+        if not still_active or iteration % REFRESH_PERIOD == 0:
+            active = range(n)
+        else:
+            active = still_active
+
+
+def page_tolerance(tolerance, norm, n):
+    """
+    Returns how much each of `n` ranks may change for the change in all
+    of them, as measured by `norm`, to stay below `tolerance`.
+    """
+    return {"max": tolerance, "l1": tolerance / n, "l2": tolerance / math.sqrt(n)}[norm]
+
+
+def normalize(ranks):
+    """
+    Returns the ranks with negative values clipped to 0, scaled to sum to 1.
+    """
+    ranks = [max(rank, 0.0) for rank in ranks]
+    total = sum(ranks)
+    return [rank / total for rank in ranks]
@@ -0,0 +1,66 @@
+import json
+import os
+import struct
+from contextlib import contextmanager
+
+# Every binary file starts with its magic bytes, layout version and header length
+PREAMBLE = struct.Struct("<4sII")
+
+# Data after the header starts on a multiple of this, so it can be viewed as arrays in place
+ALIGNMENT = 8
+
+
+@contextmanager
+def atomic_write(path, mode="wb", **kwargs):
+    """
+    Opens a temporary file next to `path` for writing, and moves it to
+    `path` only once it is complete, so readers never see a partial file.
+    """
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, mode, **kwargs) as f:
+            yield f
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+
+
+def write_header(f, magic, version, header):
+    """
+    Writes the preamble and the JSON `header` of a binary file, padded so
+    that what follows is aligned, and returns where that starts.
+    """
+    data = json.dumps(header).encode("utf-8")
+    data += b" " * (-(PREAMBLE.size + len(data)) % ALIGNMENT)
+    f.write(PREAMBLE.pack(magic, version, len(data)))
+    f.write(data)
+    return PREAMBLE.size + len(data)
+
+
+def read_header(f, magic, version):
+    """
+    Reads the preamble and JSON header at the start of a binary file,
+    and returns (header, start), where start is where the data after it
+    begins. Returns None if the file is not of `magic`
+    and `version`, or its header is cut short or unreadable.
+    """
+    preamble = f.read(PREAMBLE.size)
+    if len(preamble) < PREAMBLE.size:
+        return None
+    found_magic, found_version, length = PREAMBLE.unpack(preamble)
+    if found_magic != magic or found_version != version:
+        return None
+    data = f.read(length)
+    if len(data) < length:
+        return None
+    try:
+        header = json.loads(data)
+    except ValueError:
+        return None
+    if not isinstance(header, dict):
+        return None
+    return header, PREAMBLE.size + length